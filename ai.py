@@ -1,14 +1,21 @@
-import google.generativeai as genai
-import os
+import client
+from cache import cached_generate, cached_stream
 
-# Load your API key from environment variable or directly (not recommended to hardcode)
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-def call_gemini_api(prompt):
-    model = genai.GenerativeModel("gemini-1.5-flash")
+# The API key is read from GEMINI_API_KEY (or GOOGLE_API_KEY) by the shared client on first use
+MODEL_NAME = client.DEFAULT_MODEL
 
+def call_gemini_api(prompt, function_name="call_gemini_api", timeout=None):
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return cached_generate(
+            function_name, prompt, MODEL_NAME, lambda: client.generate_text(prompt, MODEL_NAME, timeout=timeout)
+        )
     except Exception as e:
         return f"❌ Error from Gemini API: {str(e)}"
+
+def stream_gemini_api(prompt, function_name="call_gemini_api", timeout=None):
+    try:
+        yield from cached_stream(
+            function_name, prompt, MODEL_NAME, lambda: client.stream_text(prompt, MODEL_NAME, timeout=timeout)
+        )
+    except Exception as e:
+        yield f"❌ Error from Gemini API: {str(e)}"
@@ -1,18 +1,120 @@
-import google.generativeai as genai
+import client
+import functools
+import inspect
+import logging
 import os
+import queue
+import threading
 from dotenv import load_dotenv
-import re
-from ai import call_gemini_api  # assuming you have this utility
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from cache import cached_generate, cached_stream
+from matcher import KeywordMatcher, extract_jd_terms
+from ats_rules import default_rules
+from preprocess import compact, fit_sections
+import insights
+import telemetry
 
 
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-model = genai.GenerativeModel("gemini-1.5-flash")
+logger = logging.getLogger(__name__)
 
-def analyze_with_ai(resume_text):
-    prompt = f"""
+MODEL_NAME = client.DEFAULT_MODEL
+
+# Process-wide cap on in-flight Gemini calls, shared by every session, so a burst of
+# users queues here instead of exceeding the API quota.
+MAX_CONCURRENT_CALLS = int(os.getenv("RESUMEPRO_MAX_CONCURRENCY", "4"))
+CALL_TIMEOUT = float(os.getenv("RESUMEPRO_CALL_TIMEOUT", "60"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix="gemini")
+
+# One structured JSON call per tab (get_resume_insights, get_job_match) instead of
+# a separate free-text prompt per feature
+COMBINED_PROMPTS = os.getenv("RESUMEPRO_COMBINED_PROMPTS", "1") != "0"
+
+# Token budget for the resume and job description text in one prompt (0 = clean only, no trimming)
+PROMPT_TOKEN_BUDGET = int(os.getenv("RESUMEPRO_PROMPT_TOKEN_BUDGET", "8000"))
+
+
+def _error_message(message):
+    """Make an AI function return (or, for a stream, yield) "<message>: <error>" when it raises.
+
+    That is the string the Streamlit tabs display. The raising function stays available
+    as func.raising, for callers that handle failures themselves (run_full_report, api.py):
+    an answer that happens to start with "Error" is still an answer.
+    """
+    def decorate(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                try:
+                    yield from func(*args)
+                except Exception as e:
+                    yield f"{message}: {e}"
+        else:
+            @functools.wraps(func)
+            def wrapper(*args):
+                try:
+                    return func(*args)
+                except Exception as e:
+                    return f"{message}: {e}"
+        wrapper.raising = func
+        return wrapper
+    return decorate
+
+def _prepare(function_name, resume_text, jd_text=None, sectioned=False, trim=True):
+    """Clean and budget the prompt inputs, logging the tokens saved.
+
+    A job description may use up to a third of the budget; the resume gets the rest.
+    trim=False only cleans, for prompts (the rewrites) that must see every line.
+    Returns (resume text, job description text or None).
+    """
+    budget = PROMPT_TOKEN_BUDGET if trim else 0
+    jd = compact(jd_text, budget // 3, MODEL_NAME) if jd_text else None
+    if jd and budget:
+        budget -= jd["tokens"]
+    resume = compact(resume_text, budget, MODEL_NAME, sectioned)
+    original = resume["original_tokens"] + (jd["original_tokens"] if jd else 0)
+    tokens = resume["tokens"] + (jd["tokens"] if jd else 0)
+    logger.info("%s: %d -> %d input tokens (%d saved)", function_name, original, tokens, original - tokens)
+    telemetry.increment("resumepro_prompt_tokens_total", tokens, function=function_name)
+    telemetry.increment("resumepro_prompt_tokens_saved_total", original - tokens, function=function_name)
+    return resume["text"], jd["text"] if jd else None
+
+def _generate(prompt, function_name):
+    # Identical prompts (e.g. on every Streamlit rerun) are answered from the response cache
+    with telemetry.span("ai", function=function_name):
+        return cached_generate(
+            function_name, prompt, MODEL_NAME,
+            lambda: client.generate_text(prompt, MODEL_NAME, timeout=CALL_TIMEOUT),
+        )
+
+def _stream(prompt, function_name):
+    # Shares cache entries with _generate, so a streamed answer is reused by the blocking call
+    with telemetry.span("ai_stream", function=function_name):
+        yield from cached_stream(
+            function_name, prompt, MODEL_NAME,
+            lambda: client.stream_text(prompt, MODEL_NAME, timeout=CALL_TIMEOUT),
+        )
+
+def _generate_json(prompt, function_name, schema):
+    config = {"response_mime_type": "application/json", "response_schema": schema}
+
+    def generate():
+        text = client.generate_text(prompt, MODEL_NAME, generation_config=config, timeout=CALL_TIMEOUT)
+        insights.parse(text, schema)  # raise before an unparseable response is cached
+        return text
+
+    # The raw JSON is cached; the schema version keeps old shapes from being reused
+    with telemetry.span("ai", function=function_name):
+        text = cached_generate(f"{function_name}_v{insights.SCHEMA_VERSION}", prompt, MODEL_NAME, generate)
+        return insights.parse(text, schema)
+
+def _analysis_prompt(resume_text):
+    resume_text, _ = _prepare("analyze_with_ai", resume_text)
+    return f"""
 You are a resume analysis expert.
 
 Here is a candidate's resume content:
@@ -27,51 +129,27 @@ Here is a candidate's resume content:
 
 Respond in a clear, structured format.
 """
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error during AI analysis: {e}"
-
-def get_ats_score(resume_text):
-    score = 0
-    feedback = []
-
-    # Check presence of important sections
-    required_sections = {
-        "Skills": r"skills?|technical skills?",
-        "Experience": r"experience|employment|work history",
-        "Education": r"education|qualifications",
-        "Projects": r"projects|project experience",
-        "Contact": r"(email|phone|linkedin|contact)"
-    }
-
-    for section, pattern in required_sections.items():
-        if re.search(pattern, resume_text, re.IGNORECASE):
-            score += 15
-        else:
-            feedback.append(f"❌ Missing or unclear: **{section}**")
-
-    # Keyword richness (basic estimate)
-    keyword_count = len(re.findall(r"\b(Java|Python|SQL|ML|NLP|React|Node|Excel|AWS|Docker|Kubernetes)\b", resume_text, re.IGNORECASE))
-    if keyword_count >= 5:
-        score += 25
-    elif keyword_count >= 3:
-        score += 15
-    else:
-        feedback.append("❌ Not enough technical keywords.")
 
-    # Score adjustments based on document length (optional feature)
-    word_count = len(resume_text.split())
-    if word_count < 300:
-        score -= 5  # penalize for overly short resumes
-    elif word_count > 1000:
-        score -= 5  # penalize for overly long resumes
+@_error_message("Error during AI analysis")
+def analyze_with_ai(resume_text):
+    return _generate(_analysis_prompt(resume_text), "analyze_with_ai")
+
+@_error_message("Error during AI analysis")
+def stream_analyze_with_ai(resume_text):
+    yield from _stream(_analysis_prompt(resume_text), "analyze_with_ai")
+
+def get_ats_score(resume_text, role=None):
+    # Section, keyword and length rules live in ats_rules.yaml
+    result = default_rules().evaluate(resume_text, role)
+    return result["score"], result["feedback"]
 
-    final_score = min(score, 100)
-    return final_score, feedback
+def get_ats_breakdown(resume_text, role=None):
+    """Like get_ats_score, but returns {"score", "feedback", "rules"} with a per-rule breakdown."""
+    return default_rules().evaluate(resume_text, role)
 
+@_error_message("Error during comparison")
 def compare_with_job_description(resume_text, jd_text):
+    resume_text, jd_text = _prepare("compare_with_job_description", resume_text, jd_text)
     prompt = f"""
 You are a recruitment AI.
 
@@ -89,13 +167,11 @@ Compare the following **resume** with the **job description** and give:
 
 Respond clearly and formatted.
 """
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error during comparison: {e}"
+    return _generate(prompt, "compare_with_job_description")
 
+@_error_message("Error generating summary")
 def generate_tailored_summary(resume_text, jd_text):
+    resume_text, jd_text = _prepare("generate_tailored_summary", resume_text, jd_text)
     prompt = f"""
 You are a career coach AI.
 
@@ -109,55 +185,276 @@ Based on the following resume and job description, generate a custom **professio
 
 Make it ATS-friendly and appealing to recruiters by highlighting the most relevant skills, experience, and achievements.
 """
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        return f"Error generating summary: {e}"
+    return _generate(prompt, "generate_tailored_summary").strip()
+def _rewrite_prompt(resume_text):
+    resume_text, _ = _prepare("rewrite_resume_with_ai", resume_text, trim=False)
+    return f"Rewrite and improve this resume to be more professional, ATS-friendly, and impactful:\n\n{resume_text}"
+
+@_error_message("Error during resume rewriting")
 def rewrite_resume_with_ai(resume_text):
-    prompt = f"Rewrite and improve this resume to be more professional, ATS-friendly, and impactful:\n\n{resume_text}"
-    try:
-        response = model.generate_content(prompt)  # Use the 'model' object, not 'gemini_model'
-        return response.text
-    except Exception as e:
-        return f"Error during resume rewriting: {e}"
+    return _generate(_rewrite_prompt(resume_text), "rewrite_resume_with_ai")
+
+@_error_message("Error during resume rewriting")
+def stream_rewrite_resume_with_ai(resume_text):
+    yield from _stream(_rewrite_prompt(resume_text), "rewrite_resume_with_ai")
+@_error_message("Error generating section suggestions")
 def get_section_wise_suggestions(resume_text):
+    # Sent as labelled sections, so the model does not have to find them in raw text
+    resume_text, _ = _prepare("get_section_wise_suggestions", resume_text, sectioned=True)
     prompt = (
-        "You are a resume expert. Analyze the following resume and provide section-wise suggestions "
-        "to improve each part (e.g., Experience, Education, Skills, Summary). "
+        "You are a resume expert. The following resume is split into sections, each labelled "
+        "[Section Name]. Provide section-wise suggestions to improve each part (e.g., Experience, "
+        "Education, Skills, Summary), and point out important sections that are missing. "
         "Use bullet points and keep it concise:\n\n"
         f"{resume_text}"
     )
-    response = model.generate_content(prompt)
-    return response.text
+    return _generate(prompt, "get_section_wise_suggestions")
 
-def rewrite_resume(resume_text, job_description=None):
+@_error_message("Error during AI analysis")
+def get_resume_insights(resume_text):
+    """Analysis and section-wise suggestions from one structured call.
+
+    Returns an insights.ResumeInsights dict, or an error string like the other
+    analyzer functions.
+    """
+    resume_text, _ = _prepare("get_resume_insights", resume_text, sectioned=True)
     prompt = f"""
-You are a resume expert. Rewrite the following resume to make it more ATS-friendly, professional, and clear.
+You are a resume analysis expert. The candidate's resume is below, split into sections labelled [Section Name].
 
-{"Also tailor it for the following job description:\n" + job_description if job_description else ""}
+\"\"\"{resume_text}\"\"\"
 
-Resume:
-{resume_text}
+Fill in every field:
+- summary: a short summary of the candidate.
+- strengths / weaknesses: key strengths, and weaknesses or missing parts of the resume.
+- improvements: formatting, missing sections or content recommendations.
+- job_titles: best-fit job titles based on experience and skills.
+- ats_tips: specific tips for making the resume more ATS-friendly.
+- section_suggestions: for each section (e.g. Experience, Education, Skills, Summary), concise
+  suggestions to improve it; include important sections that are missing.
+"""
+    return _generate_json(prompt, "get_resume_insights", insights.ResumeInsights)
 
-Give the improved version only.
+@_error_message("Error during comparison")
+def get_job_match(resume_text, jd_text):
+    """Resume vs job description comparison and tailored summary from one structured call.
+
+    Returns an insights.JobMatch dict, or an error string.
+    """
+    resume_text, jd_text = _prepare("get_job_match", resume_text, jd_text)
+    prompt = f"""
+You are a recruitment AI and career coach. Compare the resume with the job description.
+
+**Resume:**
+\"\"\"{resume_text}\"\"\"
+
+**Job Description:**
+\"\"\"{jd_text}\"\"\"
+
+Fill in every field:
+- match_score: how well the resume matches the job, out of 100.
+- matched_skills: skills and experience present in both (use specific keywords).
+- missing_skills: missing or mismatched keywords or qualifications (be specific about the gap).
+- tailoring_tips: how to tailor the resume for this job description.
+- tailored_summary: an ATS-friendly professional summary (max 5 lines) for the top of the resume
+  or LinkedIn profile, highlighting the most relevant skills, experience and achievements.
 """
-    return call_gemini_api(prompt)
-def highlight_resume_vs_jd(resume_text, job_description_text):
-    import re
-    from collections import Counter
+    return _generate_json(prompt, "get_job_match", insights.JobMatch)
 
-    jd_keywords = re.findall(r'\b\w+\b', job_description_text.lower())
-    common_terms = [word for word, count in Counter(jd_keywords).items() if count > 1 and len(word) > 3]
-    highlighted = resume_text
+@_error_message("Error generating section suggestions")
+def get_section_suggestions(section_name, section_text):
+    """Suggestions for a single resume section, from a structured call.
 
-    for word in common_terms:
-        pattern = re.compile(rf'\b({re.escape(word)})\b', re.IGNORECASE)
-        highlighted = pattern.sub(r'<span style="background-color:#d1fae5;"><b>\1</b></span>', highlighted)
+    Lets a revised resume be re-analysed one changed section at a time (see
+    revisions.py). Returns a list of suggestions, or an error string.
+    """
+    section_text, _ = _prepare("get_section_suggestions", section_text)
+    prompt = f"""
+You are a resume expert. Below is the {section_name} section of a candidate's resume.
 
-    return highlighted, common_terms
+\"\"\"{section_text}\"\"\"
 
+Fill in every field:
+- section: "{section_name}".
+- suggestions: concise suggestions to improve this section.
+"""
+    return _generate_json(prompt, "get_section_suggestions", insights.SectionSuggestion)["suggestions"]
+
+def _revision_text(changes):
+    # Edited sections are sent as line diffs, so a small edit costs few tokens
+    sections = []
+    for change in changes:
+        if change["status"] == "changed":
+            body = change["diff"]
+        else:
+            body = change["after"] if change["status"] == "added" else change["before"]
+        sections.append({"name": f"{change['name']} ({change['status']})", "heading": "", "body": body})
+    text, tokens = fit_sections(sections, PROMPT_TOKEN_BUDGET, MODEL_NAME, sectioned=True)
+    logger.info("get_revision_review: %d input tokens for %d changed sections", tokens, len(changes))
+    telemetry.increment("resumepro_prompt_tokens_total", tokens, function="get_revision_review")
+    return text
+
+@_error_message("Error reviewing your changes")
+def get_revision_review(changes):
+    """What improved between two uploads of a resume, judged from the changed sections only.
+
+    changes are the entries of revisions.diff_sections() whose status is not
+    "unchanged". Returns an insights.RevisionReview dict, or an error string.
+    """
+    prompt = f"""
+You are a resume expert. A candidate revised their resume. Only the sections that changed are
+shown below, each labelled [Section Name (status)]: "changed" sections are line diffs (lines
+starting with "-" were removed, "+" were added), "added" sections are new and "removed" sections
+were deleted.
+
+\"\"\"{_revision_text(changes)}\"\"\"
+
+Fill in every field:
+- summary: one or two sentences on the overall effect of the revision.
+- improved: specific changes that make the resume stronger.
+- regressed: changes that weaken it (e.g. lost metrics or keywords, or removed content).
+- next_steps: what to improve next in the changed sections.
+"""
+    return _generate_json(prompt, "get_revision_review", insights.RevisionReview)
 
+def _tailored_rewrite_prompt(resume_text, job_description=None):
+    resume_text, job_description = _prepare("rewrite_resume", resume_text, job_description, trim=False)
+    tailoring = "Also tailor it for the following job description:\n" + job_description if job_description else ""
+    return f"""
+You are a resume expert. Rewrite the following resume to make it more ATS-friendly, professional, and clear.
 
+{tailoring}
 
+Resume:
+{resume_text}
 
+Give the improved version only.
+"""
+
+@_error_message("❌ Error from Gemini API")
+def rewrite_resume(resume_text, job_description=None):
+    return _generate(_tailored_rewrite_prompt(resume_text, job_description), "rewrite_resume")
+
+@_error_message("❌ Error from Gemini API")
+def stream_rewrite_resume(resume_text, job_description=None):
+    yield from _stream(_tailored_rewrite_prompt(resume_text, job_description), "rewrite_resume")
+def match_resume_vs_jd(resume_text, job_description_text):
+    """Match the repeated JD terms against the resume in a single pass.
+
+    Returns the KeywordMatcher result (highlighted HTML, match spans and per-term
+    counts) plus the JD terms under "terms".
+    """
+    terms = extract_jd_terms(job_description_text)
+    result = KeywordMatcher(terms).match(resume_text)
+    result["terms"] = terms
+    return result
+
+def highlight_resume_vs_jd(resume_text, job_description_text):
+    result = match_resume_vs_jd(resume_text, job_description_text)
+    return result["html"], result["terms"]
+
+
+def submit_ai_call(func, *args):
+    """Schedule one of the analyzer functions on the shared bounded pool and return its Future."""
+    return _executor.submit(func, *args)
+
+def run_ai_call(func, *args):
+    """Call one of the analyzer functions on the shared bounded pool and wait for its result."""
+    return submit_ai_call(func, *args).result()
+
+_END = object()
+
+def stream_ai_call(func, *args):
+    """Iterate one of the streaming analyzer functions on the shared bounded pool.
+
+    Chunks are handed over as they arrive, so the stream holds one of the pool's
+    MAX_CONCURRENT_CALLS slots for as long as it runs. Closing this generator stops
+    the stream at its next chunk.
+    """
+    chunks = queue.Queue()
+    stop = threading.Event()
+
+    def pump():
+        stream = None
+        try:
+            stream = func(*args)
+            for chunk in stream:
+                chunks.put(chunk)
+                if stop.is_set():
+                    break
+        finally:
+            # Always end the stream, even if func raised before returning it, or the
+            # consumer would wait forever
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            chunks.put(_END)
+
+    future = submit_ai_call(pump)
+    try:
+        while (chunk := chunks.get()) is not _END:
+            yield chunk
+    finally:
+        stop.set()
+    future.result()  # re-raise what the stream raised
+
+def run_full_report(resume_text, jd_text=None, timeout=None):
+    """Run every independent AI prompt for a resume (and optional JD) concurrently.
+
+    Returns a dict with one entry per prompt plus the local ATS/keyword results.
+    Calls that raise (the AI functions run as their .raising versions) or exceed the
+    per-call timeout are left as None and reported under "errors", so one slow
+    prompt never discards the others. In combined mode
+    the typed results are also returned under "insights" and "job_match".
+    """
+    timeout = CALL_TIMEOUT if timeout is None else timeout
+    start = time.perf_counter()
+
+    if COMBINED_PROMPTS:
+        calls = {"insights": (get_resume_insights, resume_text)}
+        if jd_text:
+            calls["job_match"] = (get_job_match, resume_text, jd_text)
+    else:
+        calls = {
+            "analysis": (analyze_with_ai, resume_text),
+            "section_suggestions": (get_section_wise_suggestions, resume_text),
+        }
+        if jd_text:
+            calls.update({
+                "jd_comparison": (compare_with_job_description, resume_text, jd_text),
+                "tailored_summary": (generate_tailored_summary, resume_text, jd_text),
+            })
+    calls["rewritten_resume"] = (rewrite_resume_with_ai, resume_text)
+    if jd_text:
+        calls["tailored_resume"] = (rewrite_resume, resume_text, jd_text)
+    futures = {name: submit_ai_call(func.raising, *args) for name, (func, *args) in calls.items()}
+
+    # Local scoring runs on this thread while the AI calls are in flight
+    score, feedback = get_ats_score(resume_text)
+    report = {"ats_score": score, "ats_feedback": feedback, "matched_keywords": None, "errors": {}}
+    if jd_text:
+        _, report["matched_keywords"] = highlight_resume_vs_jd(resume_text, jd_text)
+
+    deadline = start + timeout
+    for name, future in futures.items():
+        report[name] = None
+        try:
+            report[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            future.cancel()
+            report["errors"][name] = f"Timed out after {timeout:.0f}s"
+        except Exception as e:
+            report["errors"][name] = str(e)
+
+    # Combined results are also rendered into the free-text keys
+    if "insights" in report:
+        result = report["insights"]
+        typed = isinstance(result, dict)
+        report["analysis"] = insights.insights_markdown(result) if typed else result
+        report["section_suggestions"] = insights.section_suggestions_markdown(result) if typed else result
+    if "job_match" in report:
+        result = report["job_match"]
+        typed = isinstance(result, dict)
+        report["jd_comparison"] = insights.job_match_markdown(result) if typed else result
+        report["tailored_summary"] = result["tailored_summary"] if typed else result
+
+    report["elapsed"] = time.perf_counter() - start
+    return report
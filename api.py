@@ -0,0 +1,312 @@
+"""Headless HTTP API over the parser and analyzer, for integrations that bypass Streamlit.
+
+    python api.py --port 8000           (add --stub to answer AI calls without Gemini)
+
+Resumes and job descriptions are sent either as multipart files ("resume", "jd")
+or as text fields ("resume_text", "jd_text", in a form or a JSON body).
+
+    GET  /health                  liveness
+    GET  /metrics                 API, Gemini, rate-limit and cache counters
+    GET  /metrics/prometheus      telemetry spans in Prometheus text format (RESUMEPRO_TELEMETRY=1)
+    POST /parse                   parse_document for one file
+    POST /ats-score               get_ats_breakdown (optional "role")
+    POST /highlight               match_resume_vs_jd
+    POST /analyze                 analyze_with_ai (?stream=1 streams text/plain)
+    POST /compare                 compare_with_job_description
+    POST /batch/<operation>       any of the above for many resumes: multipart "resume"
+                                  files, or JSON {"items": [{"resume_text": ...}, ...]};
+                                  ?stream=1 streams NDJSON lines as items finish
+
+With RESUMEPRO_PROFILE_REQUESTS=1, adding ?profile=1 to any request profiles it
+(see telemetry.Profiler); the report's path comes back in the X-Profile header.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import as_completed
+
+from dotenv import load_dotenv
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+
+# Ahead of the project imports, which read their RESUMEPRO_* settings at import time
+load_dotenv()
+
+import client
+import resilience
+import telemetry
+from analyzer import (
+    analyze_with_ai,
+    compare_with_job_description,
+    get_ats_breakdown,
+    match_resume_vs_jd,
+    stream_analyze_with_ai,
+    submit_ai_call,
+)
+from cache import response_cache
+from parser import ERROR_PREFIXES, parse_cache, parse_document
+
+MAX_UPLOAD_MB = int(os.getenv("RESUMEPRO_API_MAX_UPLOAD_MB", "20"))
+BATCH_LIMIT = int(os.getenv("RESUMEPRO_API_BATCH_LIMIT", "500"))
+PROFILE_REQUESTS = os.getenv("RESUMEPRO_PROFILE_REQUESTS", "0") != "0"
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _read_files(files):
+    """{name: (filename, bytes)} for the non-empty uploads, read while the request is open.
+
+    Operations only see these copies: batched AI items run on pool threads, after
+    Werkzeug has closed the request's files.
+    """
+    return {
+        key: (upload.filename, upload.read())
+        for key, upload in files.items() if upload is not None and upload.filename
+    }
+
+
+def _text_input(source, files, name, page_breaks=False):
+    """Text for "resume"/"jd" from an uploaded file or a "<name>_text" field.
+
+    page_breaks=True keeps an uploaded PDF's page breaks, for text sent to the analyzer.
+    """
+    upload = files.get(name) if files else None
+    if upload is not None:
+        filename, content = upload
+        document = parse_document(content, filename=filename, page_breaks=page_breaks)
+        if document["text"].startswith(ERROR_PREFIXES):
+            raise BadRequest(f"{name}: {document['text']}")
+        return document["text"]
+    text = source.get(f"{name}_text")
+    if not text:
+        raise BadRequest(f"Missing {name}: upload a '{name}' file or send '{name}_text'")
+    if not isinstance(text, str):
+        raise BadRequest(f"'{name}_text' must be a string")
+    return text
+
+
+def _ai_result(key, func, *args):
+    # The raising version of the analyzer function, so only a failed call is a 502
+    try:
+        return {key: func.raising(*args)}, 200
+    except Exception as e:
+        return {"error": str(e)}, 502
+
+
+# Each operation takes (fields, files) and returns (JSON body, HTTP status), where
+# files maps a field name to (filename, bytes) (see _read_files). "ai" operations run
+# on the analyzer's bounded Gemini pool when batched.
+def _parse(fields, files):
+    upload = files.get("resume") if files else None
+    if upload is None:
+        raise BadRequest("Upload a 'resume' file")
+    filename, content = upload
+    document = parse_document(content, filename=filename)
+    return document, 422 if document["text"].startswith(ERROR_PREFIXES) else 200
+
+
+def _ats_score(fields, files):
+    role = fields.get("role") or None
+    if role is not None and not isinstance(role, str):
+        raise BadRequest("'role' must be a string")
+    return get_ats_breakdown(_text_input(fields, files, "resume"), role), 200
+
+
+def _highlight(fields, files):
+    return match_resume_vs_jd(_text_input(fields, files, "resume"), _text_input(fields, files, "jd")), 200
+
+
+def _analyze(fields, files):
+    return _ai_result("analysis", analyze_with_ai, _text_input(fields, files, "resume", page_breaks=True))
+
+
+def _compare(fields, files):
+    resume_text = _text_input(fields, files, "resume", page_breaks=True)
+    jd_text = _text_input(fields, files, "jd", page_breaks=True)
+    return _ai_result("comparison", compare_with_job_description, resume_text, jd_text)
+
+
+OPERATIONS = {
+    "parse": (_parse, False),
+    "ats-score": (_ats_score, False),
+    "highlight": (_highlight, False),
+    "analyze": (_analyze, True),
+    "compare": (_compare, True),
+}
+
+
+def _run(operation, fields, files):
+    try:
+        return OPERATIONS[operation][0](fields, files)
+    except BadRequest as e:
+        return {"error": str(e)}, 400
+
+
+def _request_fields():
+    body = request.get_json(silent=True)
+    if body is None:
+        return request.form.to_dict()
+    if not isinstance(body, dict):
+        raise BadRequest("The JSON body must be an object")
+    return body
+
+
+def _batch_items():
+    """(fields, files) per batch item: one per uploaded "resume" file, or per JSON item."""
+    body = request.get_json(silent=True)
+    if body is not None:
+        items = body.get("items") if isinstance(body, dict) else None
+        if not isinstance(items, list):
+            raise BadRequest('Send {"items": [...]} or multipart "resume" files')
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise BadRequest(f"items[{index}] must be an object")
+        return [(item, None) for item in items]
+    shared = request.form.to_dict()
+    jd = _read_files({"jd": request.files.get("jd")})
+    if jd:
+        shared["jd_text"] = _text_input({}, jd, "jd")  # parsed once for the whole batch
+    return [(shared, _read_files({"resume": upload})) for upload in request.files.getlist("resume")]
+
+
+class _Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.started = time.time()
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {"requests": 0, "errors": 0, "total_time": 0.0,
+                                                          "max_time": 0.0})
+            stats["requests"] += 1
+            stats["errors"] += int(status >= 400)
+            stats["total_time"] += seconds
+            stats["max_time"] = max(stats["max_time"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._endpoints.items()}
+        for stats in endpoints.values():
+            stats["avg_time"] = stats["total_time"] / stats["requests"]
+        return {"uptime": time.time() - self.started, "endpoints": endpoints}
+
+
+def create_app(stub=False):
+    """Build the Flask app. stub=True answers AI calls with backends.StubBackend (no Gemini)."""
+    if stub:
+        from backends import StubBackend
+        client.set_backend(StubBackend())
+
+    app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024
+    metrics = _Metrics()
+
+    @app.before_request
+    def start_timer():
+        g.start = time.perf_counter()
+        # The request's span is the parent of the parse, Gemini and render spans it runs
+        g.span = telemetry.span("api", endpoint=request.path).__enter__()
+        if PROFILE_REQUESTS and request.args.get("profile") in ("1", "true"):
+            g.profiler = telemetry.Profiler(request.path.strip("/").replace("/", "_") or "root").start()
+
+    @app.after_request
+    def record(response):
+        # Streamed responses are timed to their first byte
+        metrics.record(request.url_rule.rule if request.url_rule else "unmatched",
+                       response.status_code, time.perf_counter() - g.get("start", time.perf_counter()))
+        g.span.set(status=str(response.status_code))
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            response.headers["X-Profile"] = profiler.stop()
+        return response
+
+    @app.teardown_request
+    def end_span(exc):
+        span = g.pop("span", None)
+        if span is not None:
+            span.__exit__(type(exc) if exc else None, exc, None)
+
+    @app.errorhandler(BadRequest)
+    def bad_request(e):
+        return jsonify(error=str(e)), 400
+
+    @app.get("/health")
+    def health():
+        return jsonify(status="ok")
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        return jsonify(
+            api=metrics.snapshot(), gemini=client.metrics(), resilience=resilience.stats(),
+            response_cache=response_cache.stats(), parse_cache=parse_cache.stats(),
+        )
+
+    @app.get("/metrics/prometheus")
+    def prometheus_metrics():
+        return Response(telemetry.prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+    @app.post("/analyze")
+    def analyze():
+        if request.args.get("stream") in ("1", "true"):
+            resume_text = _text_input(_request_fields(), _read_files(request.files), "resume", page_breaks=True)
+            return Response(stream_with_context(stream_analyze_with_ai(resume_text)), mimetype="text/plain")
+        body, status = _run("analyze", _request_fields(), _read_files(request.files))
+        return jsonify(body), status
+
+    def single(operation):
+        def view():
+            body, status = _run(operation, _request_fields(), _read_files(request.files))
+            return jsonify(body), status
+        view.__name__ = operation.replace("-", "_")
+        return view
+
+    for operation in ("parse", "ats-score", "highlight", "compare"):
+        app.post(f"/{operation}")(single(operation))
+
+    @app.post("/batch/<operation>")
+    def batch(operation):
+        if operation not in OPERATIONS:
+            return jsonify(error=f"Unknown operation {operation!r}; use one of {sorted(OPERATIONS)}"), 404
+        items = _batch_items()
+        if not items:
+            raise BadRequest("The batch is empty")
+        if len(items) > BATCH_LIMIT:
+            raise BadRequest(f"At most {BATCH_LIMIT} items per batch")
+
+        if OPERATIONS[operation][1]:
+            # AI items run concurrently on the shared, rate-limited Gemini pool
+            futures = {submit_ai_call(_run, operation, fields, files): index
+                       for index, (fields, files) in enumerate(items)}
+            finished = ((futures[future], future.result()) for future in as_completed(futures))
+        else:
+            finished = ((index, _run(operation, fields, files)) for index, (fields, files) in enumerate(items))
+
+        def item_result(index, body, status):
+            return {"index": index, "status": status, **body}
+
+        if request.args.get("stream") in ("1", "true"):
+            # One NDJSON line per item, in completion order
+            lines = (json.dumps(item_result(index, *result)) + "\n" for index, result in finished)
+            return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+        results = sorted((item_result(index, *result) for index, result in finished), key=lambda r: r["index"])
+        return jsonify(results=results)
+
+    return app
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Serve the ResumePro AI HTTP API.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--stub", action="store_true", help="answer AI calls with a local stub, not Gemini")
+    args = arg_parser.parse_args(argv)
+    # Flask's threaded server suits local runs; put a WSGI server (e.g. gunicorn --threads) in front in production
+    create_app(stub=args.stub).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
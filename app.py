@@ -1,23 +1,143 @@
 # --- Imports ---
+# Heavy libraries load on first use, not here: google.generativeai when Gemini is
+# first called, parser backends per file type, Selenium on a live job search,
+# numpy when jobs are ranked and reportlab when a PDF is downloaded.
+from dotenv import load_dotenv
+
+# Before the project imports: cache, client, parser, resilience and telemetry read their
+# RESUMEPRO_* settings at import time, so values from .env must already be in os.environ
+load_dotenv()
+
 import streamlit as st
-import os
 import re
-from parser import parse_resume
+import threading
+import uuid
+import client
+from cache import make_key
+from parser import parse_resume, without_page_breaks
 from analyzer import (
-    analyze_with_ai,
-    get_ats_score,
+    COMBINED_PROMPTS,
+    get_resume_insights,
+    get_job_match,
+    stream_analyze_with_ai,
+    get_revision_review,
     compare_with_job_description,
     generate_tailored_summary,
     get_section_wise_suggestions,
-    rewrite_resume,
-    rewrite_resume_with_ai,
+    stream_rewrite_resume,
+    stream_rewrite_resume_with_ai,
     highlight_resume_vs_jd,
+    run_ai_call,
+    stream_ai_call,
 )
-from scraper import scrape_linkedin_jobs
-from util import generate_pdf, generate_text_pdf
-from dotenv import load_dotenv
-
-load_dotenv()
+from job_store import iter_jobs
+from insights import insights_markdown, job_match_markdown, revision_review_markdown, section_suggestions_markdown
+import revisions
+from tasks import CANCELLED, DONE, FAILED, FINISHED, TIMED_OUT, task_queue
+
+@st.cache_resource
+def warm_up_gemini():
+    # Runs once per server process, when the first resume arrives: opens the Gemini
+    # channel (importing the SDK) in the background, off the first render's path
+    threading.Thread(target=client.warm_up, daemon=True).start()
+
+def pdf_download_button(label, title, text, file_name):
+    """A download button whose PDF is rendered only when it is clicked."""
+    def render():
+        from util import render_pdf  # reportlab is imported on the first download
+        return render_pdf(title, text)
+    st.download_button(label, render, file_name=file_name, mime="application/pdf")
+
+# --- Background tasks ---
+# Slow work (Gemini calls, scraping) runs on the shared task queue. Each session keeps
+# its task ids in session state under a slot name and polls them while they run.
+def _session_tasks():
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex
+    return st.session_state.setdefault("tasks", {})
+
+def track_inputs(scope, *inputs):
+    """Cancel and forget a scope's tasks (slots named "scope:...") when its inputs change."""
+    fingerprints = st.session_state.setdefault("task_inputs", {})
+    fingerprint = make_key(*inputs)
+    if fingerprints.get(scope) not in (None, fingerprint):
+        tasks = _session_tasks()
+        for slot in [slot for slot in tasks if slot.startswith(f"{scope}:")]:
+            task_queue.cancel(tasks.pop(slot))
+            st.session_state["task_calls"].pop(slot, None)
+    fingerprints[scope] = fingerprint
+
+def submit_task(slot, func, *args, iterate=False, retry=False, ai=False):
+    """Queue func(*args) for this session; rerunning with the same inputs reuses the task.
+
+    A task that failed, timed out or was cancelled stays in its slot (while the queue
+    retains it) and is not run again on later reruns, until its inputs change or
+    retry=True (an explicit click).
+    ai=True runs func on the analyzer's bounded Gemini pool, so the task queue's
+    threads never exceed MAX_CONCURRENT_CALLS in-flight calls. Functions that use the
+    pool themselves (revisions.suggest_sections, ranking.compare_top_jobs) leave it
+    off, or they would wait on the pool from inside it.
+    """
+    tasks = _session_tasks()
+    calls = st.session_state.setdefault("task_calls", {})
+    key = (st.session_state["session_id"], slot, make_key(func.__name__, *args))
+    previous = calls.get(slot)
+    if not retry and previous and previous[0] == key:
+        status = task_queue.status(tasks.get(slot))
+        if status and status["state"] in (CANCELLED, FAILED, TIMED_OUT):
+            return
+    calls[slot] = (key, func, args, iterate, ai)
+    if ai:
+        func, args = (stream_ai_call if iterate else run_ai_call), (func, *args)
+    task_id = task_queue.submit(func, *args, name=slot, key=key, iterate=iterate)
+    if tasks.get(slot) not in (None, task_id):
+        task_queue.cancel(tasks[slot])
+    tasks[slot] = task_id
+
+def retry_task(slot):
+    """Run a slot's last submission again."""
+    _, func, args, iterate, ai = st.session_state["task_calls"][slot]
+    submit_task(slot, func, *args, iterate=iterate, retry=True, ai=ai)
+
+def has_task(slot):
+    return slot in _session_tasks()
+
+def task_result(slot):
+    """The slot's result once its task is done, else None."""
+    status = task_queue.status(_session_tasks().get(slot))
+    return status["result"] if status and status["state"] == DONE else None
+
+def show_task(slot, render, message, render_partial=None):
+    """Render a slot's result, or its progress (polled every second) while it runs."""
+    task_id = _session_tasks().get(slot)
+    status = task_queue.status(task_id)
+    if status is None:
+        return
+    if status["state"] == DONE:
+        render(status["result"])
+    elif status["state"] in FINISHED:
+        if status["state"] == CANCELLED:
+            st.info("Cancelled.")
+        else:
+            st.error(status["error"])
+        if st.button("Retry", key=f"retry:{slot}"):
+            retry_task(slot)
+            st.rerun()
+    else:
+        _poll_task(slot, task_id, message, render_partial)
+
+@st.fragment(run_every=1.0)
+def _poll_task(slot, task_id, message, render_partial):
+    # Only this fragment reruns while the task is in flight; a full rerun renders the result
+    status = task_queue.status(task_id)
+    if status is None or status["state"] in FINISHED:
+        st.rerun()
+    st.info(f"{message} ({status['elapsed']:.0f}s)")
+    if render_partial and status["partial"]:
+        render_partial(status["partial"])
+    if st.button("Cancel", key=f"cancel:{slot}"):
+        task_queue.cancel(task_id)
+        st.rerun()
 
 # --- Page Setup ---
 st.set_page_config(page_title="ResumePro AI — Your Smart Career Companion", layout="wide")
@@ -80,6 +200,60 @@ tab_resume, tab_jd_match, tab_jobs, tab_about = st.tabs(
 # -------------------------------
 # Tab: Resume Analyzer
 # -------------------------------
+def render_insights(resume_insights):
+    if isinstance(resume_insights, str):
+        st.error(resume_insights)
+        return
+    with st.expander("AI Analysis", expanded=True):
+        st.markdown("#### Smart Insights from Gemini")
+        st.markdown(insights_markdown(resume_insights))
+    with st.expander("Section-wise Suggestions", expanded=False):
+        st.markdown("#### Suggestions to Improve")
+        st.markdown(section_suggestions_markdown(resume_insights))
+
+def render_chunks(chunks):
+    st.markdown("".join(chunks))
+
+def render_revision_review(review):
+    if isinstance(review, str):
+        st.error(review)
+        return
+    st.markdown(revision_review_markdown(review))
+
+def render_revision(previous, current):
+    """What changed since the previous upload: section by section, ATS feedback, and a
+    Gemini review of the edited sections only."""
+    changes = revisions.diff_sections(previous["sections"], current["sections"])
+    edited = [change for change in changes if change["status"] != revisions.UNCHANGED]
+    ats = revisions.ats_changes(previous, current)
+    with st.expander("What Changed Since Your Last Upload", expanded=True):
+        st.markdown(" • ".join(f"**{change['key']}**: {change['status']}" for change in changes))
+        for item in ats["resolved"]:
+            st.write(f"- Fixed: {item}")
+        for item in ats["new"]:
+            st.write(f"- New issue: {item}")
+        if not edited:
+            st.info("No section has changed since your last upload.")
+            return
+        submit_task("resume:review", get_revision_review, edited, ai=True)
+        st.markdown("#### Review of Your Changes")
+        show_task("resume:review", render_revision_review, "Reviewing your changes...")
+
+def render_section_results(version):
+    def render(result):
+        version["suggestions"].update(result["suggestions"])
+        st.caption(f"New suggestions for {len(result['requested'])} section(s); "
+                   f"reused earlier suggestions for {len(result['reused'])}.")
+        requested = set(result["requested"])
+        for section in version["sections"]:
+            if section["key"] in result["errors"]:
+                st.error(f"{section['key']}: {result['errors'][section['key']]}")
+            elif section["fingerprint"] in result["suggestions"]:
+                label = "new" if section["key"] in requested else "reused"
+                st.markdown(f"**{section['key']}** ({label})")
+                st.markdown("\n".join(f"- {item}" for item in result["suggestions"][section["fingerprint"]]))
+    return render
+
 with tab_resume:
     st.markdown("### Upload and Analyze Your Resume")
     st.markdown("Get instant AI-powered suggestions, ATS score, and section-wise improvements.")
@@ -90,43 +264,87 @@ with tab_resume:
         uploaded_file = st.file_uploader("Upload Resume", type=["pdf", "docx", "txt"], label_visibility="collapsed")
 
     if uploaded_file:
-        os.makedirs("resumes", exist_ok=True)
-        file_path = os.path.join("resumes", uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.read())
+        warm_up_gemini()
         st.success("Resume uploaded successfully!")
 
+        # Parsed straight from memory; reruns with the same file hit the parse cache. Page
+        # breaks are kept so the prompts can drop repeated page headers and footers
         with st.spinner("Parsing your resume..."):
-            resume_text = parse_resume(file_path)
+            resume_text = parse_resume(uploaded_file.getvalue(), filename=uploaded_file.name, page_breaks=True)
+        st.session_state["resume_text"] = resume_text  # used to rank job search results
+        track_inputs("resume", resume_text)
+
+        # Each distinct upload becomes a version; the one before it is kept, so a
+        # revised resume is only re-analysed where it changed
+        versions = st.session_state.setdefault("resume_versions", [])
+        if not versions or versions[-1]["text"] != resume_text:
+            versions.append(revisions.version(resume_text, versions[-1] if versions else None))
+            del versions[:-2]
+        current = versions[-1]
+        previous = versions[0] if len(versions) > 1 else None
+        incremental = revisions.INCREMENTAL and previous is not None
 
         with st.expander("Resume Preview", expanded=False):
             st.markdown("##### Parsed Resume Content")
-            st.text_area("Parsed Resume", resume_text, height=300, label_visibility="collapsed")
+            st.text_area("Parsed Resume", without_page_breaks(resume_text), height=300, label_visibility="collapsed")
 
         with st.expander("AI Resume Rewriter", expanded=False):
             if st.button("Rewrite Resume with AI"):
-                with st.spinner("Rewriting your resume..."):
-                    improved_resume = rewrite_resume_with_ai(resume_text)
+                submit_task("resume:rewrite", stream_rewrite_resume_with_ai, resume_text, iterate=True, retry=True,
+                            ai=True)
+            if has_task("resume:rewrite"):
                 st.markdown("#### AI-Enhanced Resume")
-                st.text_area("Improved Resume", improved_resume, height=300)
-
-        with st.spinner(" Analyzing with Gemini AI..."):
-            analysis = analyze_with_ai(resume_text)
-
-        with st.expander("AI Analysis", expanded=True):
-            st.markdown("#### Smart Insights from Gemini")
-            st.write(analysis)
-
-        with st.expander("Section-wise Suggestions", expanded=False):
-            if st.button("Get Section Suggestions"):
-                with st.spinner("Reviewing each section..."):
-                    section_suggestions = get_section_wise_suggestions(resume_text)
-                st.markdown("#### Suggestions to Improve")
-                st.markdown(section_suggestions)
+                show_task("resume:rewrite", render_chunks, "Rewriting your resume...", render_partial=render_chunks)
+
+        if incremental:
+            render_revision(previous, current)
+
+        # AI calls run on the background queue; this rerun renders whatever is ready.
+        # After a revision, the full analysis only runs again on request.
+        full_analysis = (not incremental or has_task("resume:insights" if COMBINED_PROMPTS else "resume:analysis")
+                         or st.button("Re-run Full Analysis"))
+        if not full_analysis:
+            with st.expander("AI Analysis", expanded=False):
+                st.caption("From an earlier upload; see above for what your changes improved.")
+                st.markdown(current["analysis"] or "No full analysis yet.")
+            submit_task("resume:section_suggestions", revisions.suggest_sections, current["sections"],
+                        previous["suggestions"])
+            with st.expander("Section-wise Suggestions", expanded=False):
+                show_task("resume:section_suggestions", render_section_results(current),
+                          "Updating section suggestions...")
+            review = task_result("resume:review")
+            parts = [current["analysis"]]
+            if isinstance(review, dict):
+                parts.append("## Changes Since Your Last Upload\n" + revision_review_markdown(review))
+            analysis = "\n\n".join(part for part in parts if part) or None
+        elif COMBINED_PROMPTS:
+            # One structured call (cached) feeds both the analysis and the section suggestions
+            submit_task("resume:insights", get_resume_insights, resume_text, ai=True)
+            show_task("resume:insights", render_insights, "Analyzing your resume...")
+            resume_insights = task_result("resume:insights")
+            analysis = insights_markdown(resume_insights) if isinstance(resume_insights, dict) else None
+            if analysis:
+                revisions.seed_suggestions(current, resume_insights)
+        else:
+            submit_task("resume:analysis", stream_analyze_with_ai, resume_text, iterate=True, ai=True)
+            with st.expander("AI Analysis", expanded=True):
+                st.markdown("#### Smart Insights from Gemini")
+                show_task("resume:analysis", render_chunks, "Analyzing your resume...", render_partial=render_chunks)
+            analysis = "".join(task_result("resume:analysis") or []) or None
+
+            with st.expander("Section-wise Suggestions", expanded=False):
+                if st.button("Get Section Suggestions"):
+                    submit_task("resume:sections", get_section_wise_suggestions, resume_text, retry=True, ai=True)
+                if has_task("resume:sections"):
+                    st.markdown("#### Suggestions to Improve")
+                    show_task("resume:sections", st.markdown, "Reviewing each section...")
+        if full_analysis and analysis:
+            current["analysis"] = analysis
 
         with st.expander("ATS Compatibility Score", expanded=True):
-            score, issues = get_ats_score(resume_text)
-            st.metric(label="Estimated ATS Score", value=f"{score}/100")
+            score, issues = current["ats_score"], current["ats_feedback"]
+            st.metric(label="Estimated ATS Score", value=f"{score}/100",
+                      delta=score - previous["ats_score"] if previous else None)
             if issues:
                 st.markdown("#### Suggestions:")
                 for issue in issues:
@@ -134,14 +352,35 @@ with tab_resume:
             else:
                 st.success("Your resume looks ATS-friendly!")
 
-        if st.button("Download Analysis as PDF"):
-            if analysis:
-                pdf_file = generate_pdf(analysis)
-                st.download_button("Download PDF", pdf_file, file_name="resume_analysis.pdf")
+        if analysis:
+            pdf_download_button("Download Analysis as PDF", "AI Resume Analysis Report", analysis,
+                                "resume_analysis.pdf")
+        else:
+            st.button("Download Analysis as PDF", disabled=True, help="Available once the analysis has finished")
 
 # -------------------------------
 # Tab: Job Description Match
 # -------------------------------
+def render_job_match(job_match):
+    if isinstance(job_match, str):
+        st.error(job_match)
+        return
+    with st.expander("AI Match Report", expanded=True):
+        st.markdown(job_match_markdown(job_match))
+
+def render_tailored_summary(tailored_summary):
+    st.code(tailored_summary, language="markdown")
+    if tailored_summary:
+        pdf_download_button("Download Summary as PDF", "Tailored Resume Summary", tailored_summary,
+                            "tailored_summary.pdf")
+
+def render_improved_resume(chunks):
+    improved_resume = "".join(chunks)
+    st.markdown(improved_resume)
+    if improved_resume:
+        pdf_download_button(" Download Rewritten Resume", "Improved Resume", improved_resume,
+                            "improved_resume.pdf")
+
 with tab_jd_match:
     st.markdown("###  Match Your Resume with a Job Description")
     st.markdown("See how well your resume aligns with a specific job and get AI-generated summaries and rewrites.")
@@ -151,18 +390,14 @@ with tab_jd_match:
     jd_file = st.file_uploader("Upload Job Description", type=["pdf", "docx", "txt"], key="jd_jd")
 
     if resume_file and jd_file:
-        os.makedirs("resumes", exist_ok=True)
-        resume_path = os.path.join("resumes", resume_file.name)
-        jd_path = os.path.join("resumes", jd_file.name)
-        with open(resume_path, "wb") as f1, open(jd_path, "wb") as f2:
-            f1.write(resume_file.read())
-            f2.write(jd_file.read())
-
-        resume_text = parse_resume(resume_path)
-        job_description_text = parse_resume(jd_path)
+        warm_up_gemini()
+        resume_text = parse_resume(resume_file.getvalue(), filename=resume_file.name, page_breaks=True)
+        job_description_text = parse_resume(jd_file.getvalue(), filename=jd_file.name, page_breaks=True)
+        track_inputs("jd", resume_text, job_description_text)
 
         with st.spinner("Comparing Resume with Job Description..."):
-            highlighted_resume, keywords = highlight_resume_vs_jd(resume_text, job_description_text)
+            highlighted_resume, keywords = highlight_resume_vs_jd(without_page_breaks(resume_text),
+                                                                  job_description_text)
 
         with st.expander("Resume vs Job Description (with Highlights)", expanded=True):
             st.markdown("#### Keywords Matched in Resume")
@@ -170,35 +405,43 @@ with tab_jd_match:
             st.markdown("#### Highlighted Resume")
             st.markdown(highlighted_resume, unsafe_allow_html=True)
 
-        with st.expander("Tailored Resume Summary (AI Generated)", expanded=False):
-            tailored_summary = generate_tailored_summary(resume_text, job_description_text)
-            st.code(tailored_summary, language="markdown")
-            if tailored_summary:
-                summary_pdf = generate_text_pdf("Tailored Resume Summary", tailored_summary)
-                st.download_button(
-                    label="Download Summary as PDF",
-                    data=summary_pdf,
-                    file_name="tailored_summary.pdf",
-                    mime="application/pdf"
-                )
+        if COMBINED_PROMPTS:
+            # Match report and tailored summary come from one structured call
+            submit_task("jd:match", get_job_match, resume_text, job_description_text, ai=True)
+            show_task("jd:match", render_job_match, "Scoring the match with AI...")
+            job_match = task_result("jd:match")
+            with st.expander("Tailored Resume Summary (AI Generated)", expanded=False):
+                if isinstance(job_match, dict):
+                    render_tailored_summary(job_match["tailored_summary"])
+        else:
+            submit_task("jd:summary", generate_tailored_summary, resume_text, job_description_text, ai=True)
+            with st.expander("Tailored Resume Summary (AI Generated)", expanded=False):
+                show_task("jd:summary", render_tailored_summary, "Writing a tailored summary...")
 
         with st.expander("Rewrite Resume with AI", expanded=False):
             if st.button("Generate Improved Resume"):
-                with st.spinner(" Rewriting resume with Gemini AI..."):
-                    improved_resume = rewrite_resume(resume_text, job_description_text)
-                st.text_area("Rewritten Resume (AI)", improved_resume, height=300, label_visibility="collapsed")
-                if improved_resume:
-                    improved_pdf = generate_text_pdf("Improved Resume", improved_resume)
-                    st.download_button(
-                        label=" Download Rewritten Resume",
-                        data=improved_pdf,
-                        file_name="improved_resume.pdf",
-                        mime="application/pdf"
-                    )
+                submit_task("jd:rewrite", stream_rewrite_resume, resume_text, job_description_text, iterate=True,
+                            retry=True, ai=True)
+            show_task("jd:rewrite", render_improved_resume, "Rewriting your resume...", render_partial=render_chunks)
 
 # -------------------------------
 # Tab: LinkedIn Job Search
 # -------------------------------
+def render_job_cards(jobs):
+    for job in jobs:
+        st.markdown(f'<div class="job-card">', unsafe_allow_html=True)
+        st.markdown(f"### {job['title']}")
+        st.markdown(f"**Company:** {job['company']}")
+        st.markdown(f"**Location:** {job['location']}")
+        st.markdown(f"[Job Link]({job['link']})")
+        st.markdown(f"**Description:** {job['description'][:200]}...")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+def render_comparisons(jobs):
+    for job in jobs:
+        with st.expander(f"{job['title']} at {job['company']}", expanded=False):
+            st.markdown(job["ai_comparison"])
+
 with tab_jobs:
     st.markdown("### Real-Time LinkedIn Job Search")
     st.markdown("Search open roles by title and view job cards fetched directly from LinkedIn.")
@@ -206,20 +449,30 @@ with tab_jobs:
     job_query = st.text_input("Enter Job Title (e.g., Data Scientist, Frontend Developer)")
 
     if job_query:
-        with st.spinner("Searching LinkedIn Jobs..."):
-            job_results = scrape_linkedin_jobs(job_query)
-
-        if job_results:
-            for job in job_results:
-                st.markdown(f'<div class="job-card">', unsafe_allow_html=True)
-                st.markdown(f"### {job['title']}")
-                st.markdown(f"**Company:** {job['company']}")
-                st.markdown(f"**Location:** {job['location']}")
-                st.markdown(f"[Job Link]({job['link']})")
-                st.markdown(f"**Description:** {job['description'][:200]}...")
-                st.markdown("</div>", unsafe_allow_html=True)
-        else:
+        track_inputs("jobs", job_query)
+        # Served from the local job index when possible; otherwise cards are
+        # shown as they are scraped, polled from the background task
+        submit_task("jobs:search", iter_jobs, job_query, iterate=True)
+        show_task("jobs:search", render_job_cards, "Searching LinkedIn Jobs...", render_partial=render_job_cards)
+        jobs = task_result("jobs:search")
+
+        if jobs is None:
+            pass  # still searching
+        elif not jobs:
             st.warning("No jobs found for this query. Try again later!")
+        elif st.session_state.get("resume_text"):
+            from ranking import compare_top_jobs, rank_jobs  # numpy, only needed once there are jobs
+
+            # Ranked locally; only the best few matches are sent to Gemini
+            st.markdown("#### Best Matches for Your Resume")
+            for job in rank_jobs(st.session_state["resume_text"], jobs, top_n=5):
+                st.markdown(f"**{job['title']}** at {job['company']} — similarity {job['similarity']:.2f} "
+                            f"([Job Link]({job['link']}))")
+            if st.button("Compare Top 3 Matches with AI"):
+                submit_task("jobs:compare", compare_top_jobs, st.session_state["resume_text"], jobs, 3, retry=True)
+            show_task("jobs:compare", render_comparisons, "Comparing your resume with the top matches...")
+        else:
+            st.info("Upload your resume in the Resume Analyzer tab to rank these jobs against it.")
 
 # -------------------------------
 # Tab: About
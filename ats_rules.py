@@ -0,0 +1,132 @@
+import os
+import re
+from collections import Counter
+
+import yaml
+
+_WORD = re.compile(r"\w+")
+
+DEFAULT_RULES_PATH = os.getenv(
+    "RESUMEPRO_ATS_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ats_rules.yaml")
+)
+
+
+class RuleSet:
+    """ATS scoring rules loaded from config and compiled once.
+
+    Section patterns are compiled once and searched individually, which CPython's
+    regex engine does faster than one combined alternation. Keywords are looked up
+    in a single word (and, when needed, phrase) count of the resume, so adding
+    keywords does not add passes over the text.
+    """
+
+    def __init__(self, config):
+        self.sections = [
+            {"name": rule["name"], "pattern": rule["pattern"], "points": rule.get("points", 15),
+             "feedback": rule.get("feedback", f"❌ Missing or unclear: **{rule['name']}**"),
+             "regex": re.compile(rule["pattern"], re.IGNORECASE)}
+            for rule in config.get("sections", [])
+        ]
+        # Section names for splitting a resume into sections: the scored sections plus
+        # unscored extras such as Summary
+        self.headings = [(rule["name"], rule["regex"]) for rule in self.sections] + [
+            (rule["name"], re.compile(rule["pattern"], re.IGNORECASE)) for rule in config.get("headings", [])
+        ]
+        keywords = config.get("keywords", {})
+        self.thresholds = sorted(keywords.get("thresholds", []), key=lambda t: t["min"], reverse=True)
+        self.keyword_feedback = keywords.get("feedback")
+        self.families = {
+            family: {str(term): float(weight) for term, weight in terms.items()}
+            for family, terms in keywords.get("families", {}).items()
+        }
+        self._keyword_plans = {}  # role -> (families, {normalized key: (term, weight)}, phrase lengths)
+
+        self.length_rules = config.get("length", [])
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(yaml.safe_load(f) or {})
+
+    def _keyword_plan(self, role):
+        plan = self._keyword_plans.get(role)
+        if plan is None:
+            families = ["general"] + ([role] if role and role != "general" else [])
+            keys = {}
+            for family in families:
+                for term, weight in self.families.get(family, {}).items():
+                    key = " ".join(_WORD.findall(term.lower()))
+                    if key and key not in keys:
+                        keys[key] = (term, weight)
+            sizes = sorted({key.count(" ") + 1 for key in keys} - {1})
+            plan = self._keyword_plans[role] = (families, keys, sizes)
+        return plan
+
+    def _keyword_counts(self, text, keys, sizes):
+        words = _WORD.findall(text.lower())
+        counts = Counter(words)
+        for n in sizes:
+            counts.update(map(" ".join, zip(*(words[i:] for i in range(n)))))
+        hits = {}
+        weighted = 0.0
+        # Set intersection keeps this proportional to the resume, not the keyword list
+        for key in counts.keys() & keys.keys():
+            term, weight = keys[key]
+            hits[term] = counts[key]
+            weighted += counts[key] * weight
+        return hits, weighted
+
+    def evaluate(self, text, role=None):
+        """Score one resume. Returns {"score", "feedback", "rules"} with a per-rule breakdown."""
+        score = 0
+        feedback = []
+        rules = []
+
+        for rule in self.sections:
+            passed = rule["regex"].search(text) is not None
+            points = rule["points"] if passed else 0
+            score += points
+            if not passed:
+                feedback.append(rule["feedback"])
+            rules.append({"rule": rule["name"], "type": "section", "passed": passed, "points": points})
+
+        families, keys, sizes = self._keyword_plan(role)
+        hits, weighted = self._keyword_counts(text, keys, sizes)
+        points = next((t["points"] for t in self.thresholds if weighted >= t["min"]), 0)
+        score += points
+        if not points and self.keyword_feedback:
+            feedback.append(self.keyword_feedback)
+        rules.append({"rule": "Keywords", "type": "keywords", "passed": bool(points), "points": points,
+                      "families": families, "weighted_count": weighted, "matched": hits})
+
+        word_count = len(text.split())
+        for rule in self.length_rules:
+            triggered = ("below" in rule and word_count < rule["below"]) or \
+                        ("above" in rule and word_count > rule["above"])
+            points = rule["points"] if triggered else 0
+            score += points
+            if triggered and rule.get("feedback"):
+                feedback.append(rule["feedback"])
+            name = f"Under {rule['below']} words" if "below" in rule else f"Over {rule['above']} words"
+            rules.append({"rule": name, "type": "length", "passed": not triggered, "points": points,
+                          "word_count": word_count})
+
+        return {"score": min(score, 100), "feedback": feedback, "rules": rules}
+
+    def score_many(self, texts, role=None):
+        return [self.evaluate(text, role) for text in texts]
+
+
+_default_rules = None
+
+
+def default_rules():
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = RuleSet.from_file()
+    return _default_rules
+
+
+def score_many(texts, role=None, rules=None):
+    """Evaluate many resumes against one compiled rule set."""
+    return (rules or default_rules()).score_many(texts, role)
@@ -0,0 +1,229 @@
+"""Stand-ins for the Gemini API, installed with client.set_backend().
+
+A backend has generate(prompt, model_name, generation_config, timeout), returning an
+object with .text (and optionally .usage_metadata), and stream(...) returning an
+iterable of chunks with .parts and .text, like generate_content(stream=True).
+
+RESUMEPRO_MODEL_BACKEND selects one at start-up (see from_env):
+
+    gemini   the real API (default)
+    stub     instant canned answers
+    fake     simulated latency, errors and streaming (RESUMEPRO_FAKE_* settings)
+    record   the real API, saving every answer to RESUMEPRO_RECORDING
+    replay   answers from RESUMEPRO_RECORDING only, no network
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from google.api_core import exceptions as api_exceptions
+
+import insights
+
+RECORDING_PATH = os.getenv("RESUMEPRO_RECORDING", os.path.join("fixtures", "gemini_recording.jsonl"))
+
+
+class Response:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.parts = [text] if text else []
+        self.usage_metadata = usage_metadata
+
+
+class StreamResponse:
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.usage_metadata = None
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield Response(chunk)
+
+
+def _schema_default(generation_config):
+    schema = (generation_config or {}).get("response_schema")
+    return json.dumps(insights.empty(schema)) if schema else None
+
+
+def _split(text, chunks):
+    size = max(1, -(-len(text) // chunks))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class GeminiBackend:
+    """The real API, as a backend (used by RecordingBackend)."""
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        import client  # client installs backends, so import it lazily
+        model = client.get_model(model_name, generation_config)
+        return model.generate_content(prompt, request_options=client._request_options(timeout))
+
+    def stream(self, prompt, model_name, generation_config=None, timeout=None):
+        import client
+        model = client.get_model(model_name, generation_config)
+        return model.generate_content(prompt, stream=True, request_options=client._request_options(timeout))
+
+
+class StubBackend:
+    """Answers instantly with canned text, or an empty object matching a JSON response schema."""
+
+    def __init__(self, text="Stub response.", chunks=3):
+        self.text = text
+        self.chunks = chunks
+        self.calls = 0
+
+    def _text(self, generation_config):
+        self.calls += 1
+        return _schema_default(generation_config) or self.text
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        return Response(self._text(generation_config))
+
+    def stream(self, prompt, model_name, generation_config=None, timeout=None):
+        return StreamResponse(_split(self._text(generation_config), self.chunks))
+
+
+class FakeBackend(StubBackend):
+    """Simulates the API's timing and failures for load tests.
+
+    Each call waits latency ± jitter seconds (time to first chunk when streaming),
+    fails with probability error_rate with a retryable 503, and streams chunks
+    chunk_delay seconds apart. output_words sizes the canned answer.
+    """
+
+    def __init__(self, latency=0.8, jitter=0.3, error_rate=0.0, chunks=10, chunk_delay=0.05,
+                 output_words=300, seed=None):
+        super().__init__(" ".join(["lorem"] * output_words), chunks)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_delay = chunk_delay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise api_exceptions.ServiceUnavailable("Fake backend: simulated outage")
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        self._wait()
+        return super().generate(prompt, model_name, generation_config, timeout)
+
+    def stream(self, prompt, model_name, generation_config=None, timeout=None):
+        self._wait()
+        chunks = _split(self._text(generation_config), self.chunks)
+
+        def paced():
+            for index, chunk in enumerate(chunks):
+                if index:
+                    time.sleep(self.chunk_delay)
+                yield chunk
+        return StreamResponse(paced())
+
+
+def recording_key(prompt, model_name, generation_config=None):
+    config = json.dumps(generation_config, sort_keys=True, default=str) if generation_config else ""
+    return hashlib.sha256(json.dumps([model_name, config, prompt]).encode("utf-8")).hexdigest()
+
+
+class RecordingBackend:
+    """Passes calls to inner and appends every answer to a JSONL recording."""
+
+    def __init__(self, path=RECORDING_PATH, inner=None):
+        self.path = path
+        self.inner = inner or GeminiBackend()
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _save(self, prompt, model_name, generation_config, chunks):
+        entry = {"key": recording_key(prompt, model_name, generation_config), "model": model_name,
+                 "prompt": prompt[:200], "chunks": chunks}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        response = self.inner.generate(prompt, model_name, generation_config, timeout)
+        self._save(prompt, model_name, generation_config, [response.text])
+        return response
+
+    def stream(self, prompt, model_name, generation_config=None, timeout=None):
+        response = self.inner.stream(prompt, model_name, generation_config, timeout)
+        return _RecordedStream(response, lambda chunks: self._save(prompt, model_name, generation_config, chunks))
+
+
+class _RecordedStream:
+    # Passes chunks through and saves them once the stream has completed
+    def __init__(self, response, on_complete):
+        self._response = response
+        self._on_complete = on_complete
+        self.usage_metadata = None
+
+    def __iter__(self):
+        chunks = []
+        for chunk in self._response:
+            if chunk.parts:
+                chunks.append(chunk.text)
+            yield chunk
+        self.usage_metadata = getattr(self._response, "usage_metadata", None)
+        self._on_complete(chunks)
+
+
+class ReplayBackend:
+    """Answers from a recording made by RecordingBackend; unknown prompts raise KeyError
+    (or go to fallback, if given)."""
+
+    def __init__(self, path=RECORDING_PATH, fallback=None):
+        self.fallback = fallback
+        self.recording = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.recording[entry["key"]] = entry["chunks"]  # the latest answer wins
+
+    def _chunks(self, prompt, model_name, generation_config):
+        chunks = self.recording.get(recording_key(prompt, model_name, generation_config))
+        if chunks is None and self.fallback is None:
+            raise KeyError(f"No recorded answer for this {model_name} prompt")
+        return chunks
+
+    def generate(self, prompt, model_name, generation_config=None, timeout=None):
+        chunks = self._chunks(prompt, model_name, generation_config)
+        if chunks is None:
+            return self.fallback.generate(prompt, model_name, generation_config, timeout)
+        return Response("".join(chunks))
+
+    def stream(self, prompt, model_name, generation_config=None, timeout=None):
+        chunks = self._chunks(prompt, model_name, generation_config)
+        if chunks is None:
+            return self.fallback.stream(prompt, model_name, generation_config, timeout)
+        return StreamResponse(chunks)
+
+
+def from_env():
+    """The backend named by RESUMEPRO_MODEL_BACKEND, or None for the real API."""
+    name = os.getenv("RESUMEPRO_MODEL_BACKEND", "gemini").lower()
+    if name == "gemini":
+        return None
+    if name == "stub":
+        return StubBackend()
+    if name == "fake":
+        return FakeBackend(
+            latency=float(os.getenv("RESUMEPRO_FAKE_LATENCY", "0.8")),
+            jitter=float(os.getenv("RESUMEPRO_FAKE_JITTER", "0.3")),
+            error_rate=float(os.getenv("RESUMEPRO_FAKE_ERROR_RATE", "0")),
+            chunk_delay=float(os.getenv("RESUMEPRO_FAKE_CHUNK_DELAY", "0.05")),
+        )
+    if name == "record":
+        return RecordingBackend()
+    if name == "replay":
+        return ReplayBackend()
+    raise ValueError(f"Unknown RESUMEPRO_MODEL_BACKEND {name!r}")
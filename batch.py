@@ -0,0 +1,170 @@
+"""Offline batch screening: score a folder of resumes against one job description.
+
+Only the local scorers (get_ats_score and the JD keyword overlap) run for every
+resume; Gemini is called for the top-K candidates only, if requested.
+
+    python batch.py resumes/ job_description.txt -o results.csv --top-k 10
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+# Load .env first: the project modules read their settings when imported
+load_dotenv()
+
+from analyzer import compare_with_job_description, get_ats_score, submit_ai_call
+from matcher import KeywordMatcher, extract_jd_terms
+from parser import ERROR_PREFIXES, parse_resume
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+COLUMNS = {
+    "file": "string", "words": "Int64", "ats_score": "Int64", "keyword_overlap": "Float64",
+    "match_score": "Float64", "matched_keywords": "string", "missing_keywords": "string",
+    "ats_feedback": "string", "error": "string",
+}
+
+_matcher = None  # built once per worker process by _init_worker
+
+
+def find_resumes(directory, recursive=False):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in sorted(files)
+                     if name.lower().endswith(SUPPORTED_EXTENSIONS))
+        if not recursive:
+            break
+    return sorted(paths)
+
+
+def _init_worker(terms):
+    global _matcher
+    _matcher = KeywordMatcher(terms)
+
+
+def _is_parse_error(text):
+    return text.startswith(ERROR_PREFIXES)
+
+
+def score_resume(path, matcher=None):
+    """Parse one resume and compute its local ATS score and JD keyword overlap."""
+    matcher = _matcher if matcher is None else matcher
+    terms = matcher.terms
+    row = dict.fromkeys(COLUMNS)
+    row["file"] = path
+    # Every file is parsed once here, so skip the parse cache and its disk writes
+    text = parse_resume(path, use_cache=False)
+    if _is_parse_error(text):
+        row["error"] = text
+        return row
+
+    counts = matcher.match(text)["counts"]
+    matched = list(counts)
+    score, feedback = get_ats_score(text)
+    overlap = len(matched) / len(terms) if terms else 0.0
+    row.update({
+        "words": len(text.split()),
+        "ats_score": score,
+        "keyword_overlap": round(overlap, 4),
+        "match_score": round(0.5 * score + 50 * overlap, 1),
+        "matched_keywords": ", ".join(matched),
+        "missing_keywords": ", ".join(term for term in terms if term not in counts),
+        "ats_feedback": "; ".join(feedback),
+    })
+    return row
+
+
+def _completed(output, fmt):
+    """Files already present in a previous (possibly interrupted) run's output."""
+    if not os.path.exists(output):
+        return set()
+    if fmt == "parquet":
+        if not os.listdir(output):
+            return set()
+        return set(pd.read_parquet(output, columns=["file"])["file"])
+    return set(pd.read_csv(output, usecols=["file"])["file"])
+
+
+def _write(rows, output, fmt, part):
+    # Explicit nullable dtypes keep every part file on the same schema
+    frame = pd.DataFrame(rows, columns=list(COLUMNS)).astype(COLUMNS)
+    if fmt == "parquet":
+        # A directory of part files, so every flush is a durable checkpoint
+        os.makedirs(output, exist_ok=True)
+        frame.to_parquet(os.path.join(output, f"part-{part:05d}.parquet"), index=False)
+    else:
+        frame.to_csv(output, mode="a", header=not os.path.exists(output), index=False)
+
+
+def screen(resume_dir, jd_text, output, fmt="csv", workers=None, recursive=False,
+           flush_every=200, chunksize=16, progress=True):
+    """Score every resume in resume_dir, appending rows to output as they complete.
+
+    Re-running with the same output skips files that were already scored.
+    Returns the number of resumes scored in this run.
+    """
+    # Same term selection as highlight_resume_vs_jd
+    terms = extract_jd_terms(jd_text)
+    done = _completed(output, fmt)
+    pending = [path for path in find_resumes(resume_dir, recursive) if path not in done]
+    part = len(os.listdir(output)) if fmt == "parquet" and os.path.isdir(output) else 0
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(terms,)) as pool:
+        results = pool.map(score_resume, pending, chunksize=chunksize)
+        for row in tqdm(results, total=len(pending), unit="resume", disable=not progress):
+            rows.append(row)
+            if len(rows) >= flush_every:
+                _write(rows, output, fmt, part)
+                rows, part = [], part + 1
+    if rows:
+        _write(rows, output, fmt, part)
+    return len(pending)
+
+
+def load_results(output, fmt="csv"):
+    return pd.read_parquet(output) if fmt == "parquet" else pd.read_csv(output)
+
+
+def compare_top_k(results, jd_text, k):
+    """Send only the k best locally-scored resumes to Gemini for a detailed comparison."""
+    top = results[results["error"].isna()].nlargest(k, "match_score").copy()
+    futures = [submit_ai_call(compare_with_job_description, parse_resume(path, page_breaks=True), jd_text)
+               for path in top["file"]]
+    top["ai_comparison"] = [future.result() for future in futures]
+    return top
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Batch-screen resumes against a job description.")
+    arg_parser.add_argument("resume_dir", help="directory of PDF/DOCX/TXT resumes")
+    arg_parser.add_argument("job_description", help="job description file (PDF/DOCX/TXT)")
+    arg_parser.add_argument("-o", "--output", default="screening_results.csv",
+                            help="CSV file, or directory of part files for --format parquet")
+    arg_parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    arg_parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    arg_parser.add_argument("--recursive", action="store_true", help="include subdirectories")
+    arg_parser.add_argument("--flush-every", type=int, default=200, help="rows per checkpoint write")
+    arg_parser.add_argument("--top-k", type=int, default=0, help="compare the top K resumes with Gemini")
+    arg_parser.add_argument("--top-k-output", default="screening_top_k.csv")
+    args = arg_parser.parse_args(argv)
+
+    jd_text = parse_resume(args.job_description)
+    if _is_parse_error(jd_text):
+        arg_parser.error(jd_text)
+
+    scored = screen(args.resume_dir, jd_text, args.output, args.format, args.workers,
+                    args.recursive, args.flush_every)
+    print(f"Scored {scored} new resume(s); results in {args.output}")
+
+    if args.top_k:
+        top = compare_top_k(load_results(args.output, args.format), jd_text, args.top_k)
+        top.to_csv(args.top_k_output, index=False)
+        print(f"Gemini comparison for top {len(top)} written to {args.top_k_output}")
+
+
+if __name__ == "__main__":
+    main()
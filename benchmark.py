@@ -0,0 +1,471 @@
+"""Micro-benchmarks for the local (non-LLM) hot paths.
+
+    python benchmark.py highlight
+    python benchmark.py parse
+    python benchmark.py rank
+    python benchmark.py pdf
+    python benchmark.py load     (Gemini replaced by a fake backend; see backends.py)
+    python benchmark.py startup  (import cost per module and the app's first render)
+    python benchmark.py scrape   (needs Chrome; runs against fixtures/ on a local server)
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import PyPDF2
+from dotenv import load_dotenv
+
+# As in app.py, .env is loaded before any project module reads its settings
+load_dotenv()
+
+from analyzer import highlight_resume_vs_jd
+from parser import PDF_BACKENDS, extract_text_from_pdf
+
+
+def _vocabulary(size, seed=0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def synthetic_text(words, vocabulary, seed=0, line_length=12):
+    rng = random.Random(seed)
+    tokens = [rng.choice(vocabulary) for _ in range(words)]
+    return "\n".join(" ".join(tokens[i:i + line_length]) for i in range(0, words, line_length))
+
+
+def timed(func, *args, repeat=5):
+    """Best-of-repeat wall time in seconds, and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def print_table(header, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
+
+
+def legacy_highlight_resume_vs_jd(resume_text, job_description_text):
+    # The per-term regex substitution that highlight_resume_vs_jd used to do
+    jd_keywords = re.findall(r'\b\w+\b', job_description_text.lower())
+    common_terms = [word for word, count in Counter(jd_keywords).items() if count > 1 and len(word) > 3]
+    highlighted = resume_text
+    for word in common_terms:
+        pattern = re.compile(rf'\b({re.escape(word)})\b', re.IGNORECASE)
+        highlighted = pattern.sub(r'<span style="background-color:#d1fae5;"><b>\1</b></span>', highlighted)
+    return highlighted, common_terms
+
+
+def bench_highlight(args):
+    vocabulary = _vocabulary(3000)
+    resume = synthetic_text(args.resume_words, vocabulary, seed=1)
+    rows = []
+    for jd_words in args.jd_words:
+        jd = synthetic_text(jd_words, vocabulary, seed=2)
+        legacy, (_, legacy_terms) = timed(legacy_highlight_resume_vs_jd, resume, jd, repeat=args.repeat)
+        current, (_, terms) = timed(highlight_resume_vs_jd, resume, jd, repeat=args.repeat)
+        rows.append([jd_words, len(legacy_terms), len(terms), f"{legacy * 1000:.1f}",
+                     f"{current * 1000:.1f}", f"{legacy / current:.1f}x"])
+    print(f"highlight_resume_vs_jd, resume of {args.resume_words} words (best of {args.repeat})")
+    print_table(["jd words", "legacy terms", "terms", "legacy ms", "current ms", "speedup"], rows)
+
+
+def synthetic_pdf(path, pages, vocabulary, seed=0, lines_per_page=45):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(path, pagesize=letter)
+    text = synthetic_text(pages * lines_per_page * 12, vocabulary, seed=seed).splitlines()
+    for page in range(pages):
+        y = letter[1] - 50
+        for line in text[page * lines_per_page:(page + 1) * lines_per_page]:
+            c.drawString(40, y, line)
+            y -= 15
+        c.showPage()
+    c.save()
+    return path
+
+
+def legacy_extract_text_from_pdf(file_path):
+    # The serial PyPDF2 loop with string concatenation that parser.py used to run
+    text = ""
+    with open(file_path, "rb") as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        for page in pdf_reader.pages:
+            text += page.extract_text() or ""
+    return text
+
+
+def bench_parse(args):
+    vocabulary = _vocabulary(3000)
+    variants = [("legacy", legacy_extract_text_from_pdf)]
+    for backend in PDF_BACKENDS:
+        variants.append((backend, lambda path, backend=backend: extract_text_from_pdf(path, backend)))
+        variants.append((f"{backend} x{args.workers}",
+                         lambda path, backend=backend: extract_text_from_pdf(path, backend, workers=args.workers)))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = synthetic_pdf(os.path.join(tmp, f"{pages}.pdf"), pages, vocabulary, seed=pages)
+            row = [pages]
+            for _, func in variants:
+                seconds, _ = timed(func, path, repeat=args.repeat)
+                row.append(f"{seconds * 1000:.0f}")
+            rows.append(row)
+    print(f"PDF text extraction, ms (best of {args.repeat})")
+    print_table(["pages"] + [name for name, _ in variants], rows)
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_fixtures(directory=FIXTURES_DIR):
+    """Serve the saved HTML fixtures on a free local port; yields the base URL."""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def bench_scrape(args):
+    from scraper import DriverPool, scrape_linkedin_jobs
+
+    rows = []
+    with serve_fixtures() as base:
+        url = f"{base}/linkedin_jobs.html"
+
+        for _ in range(args.searches):
+            cold = DriverPool(size=1)
+            start = time.perf_counter()
+            jobs = scrape_linkedin_jobs("Data Engineer", max_results=args.max_results, base_url=url, pool=cold)
+            rows.append(["cold browser", len(jobs), f"{time.perf_counter() - start:.2f}"])
+            cold.close()
+
+        pool = DriverPool(size=1)
+        pool.warm_up()
+        for _ in range(args.searches):
+            start = time.perf_counter()
+            jobs = scrape_linkedin_jobs("Data Engineer", max_results=args.max_results, base_url=url, pool=pool)
+            rows.append(["pooled browser", len(jobs), f"{time.perf_counter() - start:.2f}"])
+        pool.close()
+
+    print("scrape_linkedin_jobs against the local fixture, seconds per search")
+    print_table(["mode", "jobs", "seconds"], rows)
+
+
+def synthetic_jobs(count, vocabulary, seed=0, words=120):
+    rng = random.Random(seed)
+    return [{
+        "title": " ".join(rng.sample(vocabulary, 3)),
+        "company": rng.choice(vocabulary).title(),
+        "location": "Remote",
+        "link": f"https://example.com/jobs/{i}",
+        "description": synthetic_text(words, vocabulary, seed=seed + i),
+    } for i in range(count)]
+
+
+def bench_rank(args):
+    from ranking import JobIndex
+
+    vocabulary = _vocabulary(3000)
+    resume = synthetic_text(args.resume_words, vocabulary, seed=1)
+    rows = []
+    for count in args.jobs:
+        jobs = synthetic_jobs(count, vocabulary, seed=count)
+        for method in ("tfidf", "bm25"):
+            build, index = timed(JobIndex, jobs, method, repeat=args.repeat)
+            rank, _ = timed(index.rank, resume, 5, repeat=args.repeat)
+            rows.append([count, method, f"{build * 1000:.1f}", f"{rank * 1000:.2f}"])
+    print(f"Ranking jobs against a resume of {args.resume_words} words, ms (best of {args.repeat})")
+    print_table(["jobs", "method", "index ms", "rank ms"], rows)
+
+
+def legacy_generate_pdf(analysis_text, file_name):
+    # The character-at-a-time wrapping loop generate_pdf used to run, writing to a file
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(file_name, pagesize=letter)
+    width, height = letter
+    c.setFont("Helvetica", 12)
+    text_object = c.beginText(40, height - 80)
+    text_object.setLeading(16)
+    max_width = width - 80
+    for line in analysis_text.splitlines():
+        while line:
+            if c.stringWidth(line, "Helvetica", 12) < max_width:
+                text_object.textLine(line)
+                break
+            cutoff = len(line)
+            while c.stringWidth(line[:cutoff], "Helvetica", 12) > max_width:
+                cutoff -= 1
+            split_point = line.rfind(" ", 0, cutoff)
+            if split_point == -1:
+                split_point = cutoff
+            text_object.textLine(line[:split_point])
+            line = line[split_point:].lstrip()
+        if text_object.getY() < 50:
+            c.drawText(text_object)
+            c.showPage()
+            text_object = c.beginText(40, height - 50)
+            text_object.setLeading(16)
+            c.setFont("Helvetica", 12)
+    c.drawText(text_object)
+    c.showPage()
+    c.save()
+    return file_name
+
+
+def bench_pdf(args):
+    from util import REPORT_TITLE, render_pdf
+
+    vocabulary = _vocabulary(3000)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            # Paragraph-length lines (~45 lines of body text per page) exercise the wrapping
+            text = synthetic_text(pages * 45 * 12, vocabulary, seed=pages, line_length=12 * args.line_factor)
+            legacy, _ = timed(legacy_generate_pdf, text, os.path.join(tmp, "legacy.pdf"), repeat=args.repeat)
+            current, pdf = timed(render_pdf, REPORT_TITLE, text, repeat=args.repeat)
+            rows.append([pages, len(PyPDF2.PdfReader(BytesIO(pdf)).pages), f"{legacy * 1000:.0f}",
+                         f"{current * 1000:.0f}", f"{legacy / current:.1f}x"])
+    print(f"render_pdf, ms (best of {args.repeat})")
+    print_table(["target pages", "pages", "legacy ms", "current ms", "speedup"], rows)
+
+
+def percentile_row(latencies):
+    import numpy as np
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return [f"{p50:.1f}", f"{p95:.1f}", f"{p99:.1f}"]
+
+
+def run_load(func, requests, concurrency):
+    """Call func(i) for i in range(requests) from concurrency threads.
+
+    Returns (per-call latencies in seconds, error count, wall time). A call errs if it raises.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def timed_call(i):
+        start = time.perf_counter()
+        try:
+            func(i)
+            failed = False
+        except Exception:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed_call, range(requests)))
+    wall = time.perf_counter() - start
+    return [latency for latency, _ in outcomes], sum(failed for _, failed in outcomes), wall
+
+
+def bench_load(args):
+    import backends
+    import cache
+    import client
+    import resilience
+    from analyzer import (analyze_with_ai, compare_with_job_description, get_ats_score,
+                          get_resume_insights, stream_analyze_with_ai)
+    from parser import parse_resume
+    from util import REPORT_TITLE, render_pdf
+
+    if args.backend == "fake":
+        backend = backends.FakeBackend(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                       chunk_delay=args.chunk_delay, seed=0)
+    elif args.backend == "replay":
+        backend = backends.ReplayBackend(args.recording, fallback=backends.StubBackend())
+    else:
+        backend = backends.StubBackend()
+    client.set_backend(backend)
+    # Every request must reach the backend: no response cache, no shared quota unless asked for
+    cache.CACHE_ENABLED = False
+    resilience.limiter = resilience.TokenBucket(args.rpm or 1e9, args.burst if args.rpm else 10**9)
+    resilience.MAX_BACKOFF = args.max_backoff
+
+    vocabulary = _vocabulary(3000)
+    resume = synthetic_text(args.resume_words, vocabulary, seed=1)
+    jd = synthetic_text(400, vocabulary, seed=2)
+    report = synthetic_text(args.report_words, vocabulary, seed=3, line_length=80)
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(synthetic_pdf(os.path.join(tmp, "resume.pdf"), 2, vocabulary), "rb") as f:
+            resume_pdf = f.read()
+
+    # Each request gets a distinct resume, so nothing is served from a cache or coalesced. The
+    # AI functions run as their .raising versions, so a failed call counts as an error
+    operations = {
+        "parse": lambda i: parse_resume(resume_pdf, "resume.pdf", use_cache=False),
+        "ats": lambda i: get_ats_score(f"{resume}\nref {i}"),
+        "highlight": lambda i: highlight_resume_vs_jd(f"{resume}\nref {i}", jd),
+        "analyze": lambda i: analyze_with_ai.raising(f"{resume}\nref {i}"),
+        "stream": lambda i: "".join(stream_analyze_with_ai.raising(f"{resume}\nref {i}")),
+        "compare": lambda i: compare_with_job_description.raising(f"{resume}\nref {i}", jd),
+        "insights": lambda i: get_resume_insights.raising(f"{resume}\nref {i}"),
+        "pdf": lambda i: render_pdf(REPORT_TITLE, report),
+    }
+    rows = []
+    for name in args.operations:
+        for concurrency in args.concurrency:
+            latencies, errors, wall = run_load(operations[name], args.requests, concurrency)
+            rows.append([name, concurrency, args.requests, errors] + percentile_row(latencies) +
+                        [f"{args.requests / wall:.1f}"])
+    print(f"Load test ({args.backend} backend"
+          + (f", {args.latency:.2f}s ± {args.jitter:.2f}s, {args.error_rate:.0%} errors" if args.backend == "fake" else "")
+          + (f", {args.rpm:.0f} RPM limit" if args.rpm else "") + ")")
+    print_table(["operation", "concurrency", "requests", "errors", "p50 ms", "p95 ms", "p99 ms", "req/s"], rows)
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Third-party libraries worth keeping off the start-up path, then the app's own modules
+STARTUP_MODULES = [
+    "streamlit", "google.generativeai", "google.api_core.exceptions", "selenium.webdriver",
+    "webdriver_manager.chrome", "reportlab.pdfgen.canvas", "PyPDF2", "pypdf", "docx", "numpy",
+    "parser", "analyzer", "client", "job_store", "ranking", "scraper", "util",
+]
+HEAVY_MODULES = ["google.generativeai", "grpc", "selenium", "webdriver_manager", "reportlab",
+                 "PyPDF2", "pypdf", "docx", "numpy"]
+
+_IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_FIRST_RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120).run()
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "exceptions": len(app.exception),
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _run_python(script):
+    # A fresh interpreter each time, so nothing is already imported
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_DIR, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def bench_startup(args):
+    rows = []
+    for module in args.modules:
+        try:
+            seconds = min(float(_run_python(_IMPORT_SCRIPT.format(module=module))) for _ in range(args.repeat))
+        except subprocess.CalledProcessError:
+            rows.append([module, "not installed"])
+            continue
+        rows.append([module, f"{seconds * 1000:.0f}"])
+    print(f"Import time in a fresh interpreter, ms (best of {args.repeat}; includes the module's dependencies)")
+    print_table(["module", "ms"], rows)
+
+    renders = [json.loads(_run_python(_FIRST_RENDER_SCRIPT.format(heavy=HEAVY_MODULES))) for _ in range(args.repeat)]
+    best = min(renders, key=lambda render: render["seconds"])
+    print()
+    print(f"Time to first render of app.py (AppTest, fresh interpreter, best of {args.repeat}): "
+          f"{best['seconds']:.2f}s, target {args.target:.2f}s: {'met' if best['seconds'] <= args.target else 'MISSED'}")
+    if best["exceptions"]:
+        print(f"  the script raised {best['exceptions']} exception(s)")
+    print(f"  heavy modules loaded by the first render: {', '.join(best['loaded']) or 'none'}")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    highlight = commands.add_parser("highlight", help="keyword highlighting vs. the per-term regex version")
+    highlight.add_argument("--resume-words", type=int, default=2000)
+    highlight.add_argument("--jd-words", type=int, nargs="+", default=[200, 1000, 5000, 20000])
+    highlight.add_argument("--repeat", type=int, default=3)
+    highlight.set_defaults(func=bench_highlight)
+
+    parse = commands.add_parser("parse", help="PDF extraction per backend, serial and page-parallel")
+    parse.add_argument("--pages", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parse.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parse.add_argument("--repeat", type=int, default=3)
+    parse.set_defaults(func=bench_parse)
+
+    rank = commands.add_parser("rank", help="local TF-IDF/BM25 ranking of job listings")
+    rank.add_argument("--jobs", type=int, nargs="+", default=[100, 1000, 5000])
+    rank.add_argument("--resume-words", type=int, default=600)
+    rank.add_argument("--repeat", type=int, default=3)
+    rank.set_defaults(func=bench_rank)
+
+    pdf = commands.add_parser("pdf", help="analysis report rendering vs. the character-at-a-time wrapper")
+    pdf.add_argument("--pages", type=int, nargs="+", default=[10, 25, 50, 100])
+    pdf.add_argument("--line-factor", type=int, default=8, help="source line length, in wrapped lines")
+    pdf.add_argument("--repeat", type=int, default=3)
+    pdf.set_defaults(func=bench_pdf)
+
+    load = commands.add_parser("load", help="latency percentiles and throughput under concurrency")
+    load.add_argument("--operations", nargs="+", default=["parse", "ats", "highlight", "analyze", "stream",
+                                                           "compare", "insights", "pdf"])
+    load.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    load.add_argument("--requests", type=int, default=48)
+    load.add_argument("--backend", choices=["fake", "stub", "replay"], default="fake")
+    load.add_argument("--recording", default=None, help="JSONL recording for --backend replay")
+    load.add_argument("--latency", type=float, default=0.3, help="fake backend seconds per call")
+    load.add_argument("--jitter", type=float, default=0.1)
+    load.add_argument("--error-rate", type=float, default=0.0)
+    load.add_argument("--chunk-delay", type=float, default=0.02)
+    load.add_argument("--rpm", type=float, default=0, help="apply this Gemini rate limit (default: none)")
+    load.add_argument("--burst", type=int, default=5)
+    load.add_argument("--max-backoff", type=float, default=0.5, help="retry backoff cap, seconds")
+    load.add_argument("--resume-words", type=int, default=600)
+    load.add_argument("--report-words", type=int, default=3000, help="words in the PDF report")
+    load.set_defaults(func=bench_load)
+
+    startup = commands.add_parser("startup", help="import cost per module and time to the app's first render")
+    startup.add_argument("--modules", nargs="+", default=STARTUP_MODULES)
+    startup.add_argument("--repeat", type=int, default=3)
+    startup.add_argument("--target", type=float, default=1.5,
+                         help="first-render budget in seconds for a cold container")
+    startup.set_defaults(func=bench_startup)
+
+    scrape = commands.add_parser("scrape", help="job scraping with a cold vs. pooled browser (needs Chrome)")
+    scrape.add_argument("--searches", type=int, default=3)
+    scrape.add_argument("--max-results", type=int, default=50)
+    scrape.set_defaults(func=bench_scrape)
+
+    args = arg_parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = os.getenv("RESUMEPRO_CACHE_DIR", ".cache")
+CACHE_ENABLED = os.getenv("RESUMEPRO_CACHE", "1") != "0"
+CACHE_TTL = int(os.getenv("RESUMEPRO_CACHE_TTL", str(7 * 24 * 3600)))  # one week
+# Seconds a cache read or write waits for another process's write lock before giving up
+BUSY_TIMEOUT = 0.5
+
+
+def normalize_prompt(prompt):
+    # Whitespace-only differences (e.g. PDF re-extraction) should hit the same entry
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def make_key(*parts):
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """In-memory LRU in front of a SQLite table, with TTL and size-based eviction.
+
+    Values must be JSON-serializable. Expired or evicted entries are simply misses.
+    """
+
+    def __init__(self, name, cache_dir=CACHE_DIR, max_memory_entries=256,
+                 max_disk_entries=5000, ttl=CACHE_TTL):
+        self.name = name
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0,
+                       "sets": 0, "evictions": 0, "disk_errors": 0}
+        self._db = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(cache_dir, f"{name}.sqlite3"),
+                                       timeout=BUSY_TIMEOUT, check_same_thread=False)
+            try:
+                # Readers never wait for a writer, and writers only for each other
+                self._db.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError:
+                pass  # another process is converting it right now
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._db.commit()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            row = self._read(key) if self._db is not None else None
+            if row is not None:
+                value, created = row
+                if not self._expired(created, now):
+                    self._write("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                    value = json.loads(value)
+                    self._remember(key, created, value)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return value
+                self._write("DELETE FROM entries WHERE key = ?", (key,))
+
+            self._stats["misses"] += 1
+            return None
+
+    # A locked database (another process writing) makes a read a miss and skips the
+    # bookkeeping writes of a hit, instead of failing the call the cache sits in front of
+    def _read(self, key):
+        try:
+            return self._db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            self._stats["disk_errors"] += 1
+            return None
+
+    def _write(self, sql, params):
+        try:
+            self._db.execute(sql, params)
+            self._db.commit()
+        except sqlite3.OperationalError:
+            self._db.rollback()
+            self._stats["disk_errors"] += 1
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._stats["sets"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), now, now),
+                    )
+                    self._evict_disk(now)
+                    self._db.commit()
+                except sqlite3.OperationalError:
+                    # Another process holds the write lock; the memory tier still has the entry
+                    self._db.rollback()
+                    self._stats["disk_errors"] += 1
+
+    def _remember(self, key, created, value):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                try:
+                    (stats["disk_entries"],) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+                except sqlite3.OperationalError:
+                    stats["disk_entries"] = None
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+response_cache = TieredCache("responses")
+
+
+def cached_generate(function_name, prompt, model_name, generate):
+    """Return the cached text for this prompt, or call generate() and cache its result.
+
+    generate() is expected to raise on failure; only successful responses are stored,
+    so the error strings the callers build in their except blocks are never cached.
+    """
+    if not CACHE_ENABLED:
+        return generate()
+
+    key = make_key(function_name, model_name, normalize_prompt(prompt))
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    text = generate()
+    if text:
+        response_cache.set(key, text)
+    return text
+
+
+def cached_stream(function_name, prompt, model_name, stream):
+    """Streaming counterpart of cached_generate.
+
+    Yields the cached text as a single chunk on a hit. On a miss, yields the chunks
+    from stream() as they arrive and caches the joined text once the stream has
+    completed; an interrupted or failed stream is not cached.
+    """
+    if not CACHE_ENABLED:
+        yield from stream()
+        return
+
+    key = make_key(function_name, model_name, normalize_prompt(prompt))
+    cached = response_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    for chunk in stream():
+        chunks.append(chunk)
+        yield chunk
+    text = "".join(chunks)
+    if text:
+        response_cache.set(key, text)
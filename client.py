@@ -0,0 +1,245 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+import resilience
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+_lock = threading.Lock()
+_configured = False
+_genai = None  # google.generativeai, imported by configure(): it pulls in grpc and protobuf
+_models = {}  # (model name, generation config) -> GenerativeModel
+_metrics = {}  # model name -> counters
+_backend = None  # stand-in for the Gemini API, e.g. backends.StubBackend
+
+
+def set_backend(backend):
+    """Route generate_text/stream_text to backend (generate() and stream() methods) instead of
+    the Gemini API; None restores the real API."""
+    global _backend
+    _backend = backend
+
+
+def _api_key():
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    google_key = os.getenv("GOOGLE_API_KEY")
+    if gemini_key and google_key and gemini_key != google_key:
+        logger.warning("GEMINI_API_KEY and GOOGLE_API_KEY differ; using GEMINI_API_KEY")
+    return gemini_key or google_key
+
+
+def configure():
+    """Import and configure the genai SDK once per process, on first use rather than at import."""
+    global _configured, _genai
+    if _configured:
+        return
+    with _lock:
+        if not _configured:
+            import google.generativeai as genai
+            load_dotenv()
+            genai.configure(api_key=_api_key())
+            _genai = genai
+            _configured = True
+
+
+def _config_key(generation_config):
+    return json.dumps(generation_config, sort_keys=True, default=str) if generation_config else ""
+
+
+def get_model(model_name=DEFAULT_MODEL, generation_config=None):
+    """Return the shared GenerativeModel for this (model name, generation config).
+
+    The model keeps its underlying API client, so every caller reuses one channel.
+    """
+    key = (model_name, _config_key(generation_config))
+    model = _models.get(key)
+    if model is None:
+        configure()
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = _genai.GenerativeModel(model_name, generation_config=generation_config)
+                _models[key] = model
+    return model
+
+
+def warm_up(model_name=DEFAULT_MODEL):
+    """Create the model and open its channel ahead of the first real request."""
+    if _backend is not None:
+        return True
+    try:
+        get_model(model_name).count_tokens("warm-up")
+        return True
+    except Exception as e:
+        logger.warning("Gemini warm-up failed: %s", e)
+        return False
+
+
+def estimate_tokens(text):
+    # Gemini averages roughly four characters per token for English text
+    return -(-len(text) // 4)
+
+
+COUNT_TOKENS_TIMEOUT = 5.0
+
+
+@functools.lru_cache(maxsize=1024)
+def _count_tokens(model_name, text):
+    # Counting must never hold a prompt up for long, so no retries and a short deadline
+    response = get_model(model_name).count_tokens(text, request_options=_request_options(COUNT_TOKENS_TIMEOUT))
+    return response.total_tokens
+
+
+_count_tokens_retry_at = 0.0
+
+
+def count_tokens(text, model_name=DEFAULT_MODEL):
+    """Token count from the model's tokenizer (cached per text), or an estimate if it is unreachable.
+
+    After a failed count, estimates are used for a minute rather than paying for
+    another failing round-trip on every prompt.
+    """
+    global _count_tokens_retry_at
+    if not text:
+        return 0
+    if _backend is not None or not _api_key() or time.monotonic() < _count_tokens_retry_at:
+        return estimate_tokens(text)
+    try:
+        return _count_tokens(model_name, text)
+    except Exception as e:
+        logger.warning("count_tokens failed, estimating for the next minute: %s", e)
+        _count_tokens_retry_at = time.monotonic() + 60
+        return estimate_tokens(text)
+
+
+def _model_metrics(model_name):
+    stats = _metrics.get(model_name)
+    if stats is None:
+        stats = _metrics.setdefault(model_name, {
+            "calls": 0, "errors": 0, "retries": 0,
+            "total_latency": 0.0, "max_latency": 0.0, "last_latency": 0.0,
+            "prompt_tokens": 0, "output_tokens": 0,
+        })
+    return stats
+
+
+def record_retry(model_name=DEFAULT_MODEL):
+    with _lock:
+        _model_metrics(model_name)["retries"] += 1
+    telemetry.increment("resumepro_gemini_retries_total", model=model_name)
+
+
+def _record_call(model_name, latency, usage=None, error=False):
+    with _lock:
+        stats = _model_metrics(model_name)
+        stats["calls"] += 1
+        stats["errors"] += int(error)
+        stats["total_latency"] += latency
+        stats["last_latency"] = latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        if usage is not None:
+            stats["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+            stats["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+
+
+def metrics():
+    """Per-model call, latency, token and retry counters since process start."""
+    with _lock:
+        snapshot = {name: dict(stats) for name, stats in _metrics.items()}
+    for stats in snapshot.values():
+        stats["avg_latency"] = stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0
+    return snapshot
+
+
+def _record_usage(span, usage):
+    if usage is not None:
+        span.set(prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                 output_tokens=getattr(usage, "candidates_token_count", 0) or 0)
+
+
+def _request_options(timeout):
+    # Retries are handled by the resilience layer, so disable the API core's own
+    return {"retry": None, "timeout": timeout} if timeout else {"retry": None}
+
+
+def generate_text(prompt, model_name=DEFAULT_MODEL, generation_config=None, timeout=None):
+    """Blocking generate_content call that returns response.text and records metrics.
+
+    Runs under the shared rate limiter and retry policy; identical concurrent
+    requests are coalesced into one upstream call.
+    """
+    backend = _backend
+    model = get_model(model_name, generation_config) if backend is None else None
+    span = telemetry.span("gemini", model=model_name, prompt_chars=len(prompt))
+
+    def call():
+        start = time.perf_counter()
+        try:
+            if backend is not None:
+                response = backend.generate(prompt, model_name, generation_config, timeout)
+            else:
+                response = model.generate_content(prompt, request_options=_request_options(timeout))
+            text = response.text
+        except Exception:
+            _record_call(model_name, time.perf_counter() - start, error=True)
+            raise
+        _record_call(model_name, time.perf_counter() - start, getattr(response, "usage_metadata", None))
+        _record_usage(span, getattr(response, "usage_metadata", None))
+        span.set(output_chars=len(text))
+        return text
+
+    key = (model_name, _config_key(generation_config), prompt)
+    with span:
+        # The span includes rate-limit waits and retries, i.e. what the caller waited for
+        return resilience.call_with_resilience(
+            call, key=key, timeout=timeout, on_retry=lambda exc: record_retry(model_name)
+        )
+
+
+def stream_text(prompt, model_name=DEFAULT_MODEL, generation_config=None, timeout=None):
+    """Yield response text chunks from generate_content(stream=True), recording metrics at the end.
+
+    Only opening the stream is rate limited and retried; a stream that fails midway raises.
+    """
+    backend = _backend
+    model = get_model(model_name, generation_config) if backend is None else None
+    start = time.perf_counter()
+    span = telemetry.span("gemini_stream", model=model_name, prompt_chars=len(prompt))
+    output_chars = 0
+    try:
+        if backend is not None:
+            open_stream = lambda: backend.stream(prompt, model_name, generation_config, timeout)
+        else:
+            open_stream = lambda: model.generate_content(prompt, stream=True, request_options=_request_options(timeout))
+        with span:
+            response = resilience.call_with_resilience(
+                open_stream, timeout=timeout, on_retry=lambda exc: record_retry(model_name),
+            )
+            for chunk in response:
+                if chunk.parts:
+                    if not output_chars:
+                        telemetry.observe("resumepro_gemini_first_chunk_seconds", time.perf_counter() - start,
+                                          model=model_name)
+                    output_chars += len(chunk.text)
+                    yield chunk.text
+            span.set(output_chars=output_chars)
+            _record_usage(span, getattr(response, "usage_metadata", None))
+    except Exception:
+        _record_call(model_name, time.perf_counter() - start, error=True)
+        raise
+    _record_call(model_name, time.perf_counter() - start, getattr(response, "usage_metadata", None))
+
+
+# RESUMEPRO_MODEL_BACKEND swaps the API for a stand-in, e.g. for offline runs (see backends.py)
+if os.getenv("RESUMEPRO_MODEL_BACKEND", "gemini").lower() != "gemini":
+    import backends
+    set_backend(backends.from_env())
@@ -0,0 +1,114 @@
+"""Typed results for the combined (one call per tab) JSON prompts.
+
+The TypedDicts double as Gemini response schemas, so the model is constrained to
+return exactly these fields; parse() fills in anything a response still omits.
+"""
+import json
+import typing
+
+from typing_extensions import TypedDict  # pydantic (used by genai for schemas) needs this on Python < 3.12
+
+# Bump when a schema changes, so cached responses in the old shape are not reused
+SCHEMA_VERSION = 1
+
+
+class SectionSuggestion(TypedDict):
+    section: str
+    suggestions: list[str]
+
+
+class ResumeInsights(TypedDict):
+    summary: str
+    strengths: list[str]
+    weaknesses: list[str]
+    improvements: list[str]
+    job_titles: list[str]
+    ats_tips: list[str]
+    section_suggestions: list[SectionSuggestion]
+
+
+class JobMatch(TypedDict):
+    match_score: int
+    matched_skills: list[str]
+    missing_skills: list[str]
+    tailoring_tips: list[str]
+    tailored_summary: str
+
+
+class RevisionReview(TypedDict):
+    summary: str
+    improved: list[str]
+    regressed: list[str]
+    next_steps: list[str]
+
+
+def _coerce(value, annotation):
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        (item_type,) = typing.get_args(annotation)
+        return [_coerce(item, item_type) for item in value] if isinstance(value, list) else []
+    if isinstance(annotation, type) and issubclass(annotation, dict):
+        value = value if isinstance(value, dict) else {}
+        return {field: _coerce(value.get(field), hint) for field, hint in typing.get_type_hints(annotation).items()}
+    if annotation is int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
+    return "" if value is None else str(value).strip()
+
+
+def parse(text, schema):
+    """Parse a JSON response into schema (a TypedDict above), with missing fields defaulted.
+
+    Raises ValueError if the text is not a JSON object.
+    """
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    return _coerce(data, schema)
+
+
+def empty(schema):
+    """An instance of schema with every field defaulted."""
+    return _coerce({}, schema)
+
+
+def _bullets(items):
+    return "\n".join(f"- {item}" for item in items) or "- None"
+
+
+def insights_markdown(insights):
+    """The full analysis as markdown, e.g. for the PDF download."""
+    return "\n\n".join([
+        f"### Summary\n{insights['summary']}",
+        f"### Strengths\n{_bullets(insights['strengths'])}",
+        f"### Weaknesses\n{_bullets(insights['weaknesses'])}",
+        f"### Suggested Improvements\n{_bullets(insights['improvements'])}",
+        f"### Best-fit Job Titles\n{_bullets(insights['job_titles'])}",
+        f"### ATS Tips\n{_bullets(insights['ats_tips'])}",
+    ])
+
+
+def section_suggestions_markdown(insights):
+    return "\n\n".join(
+        f"**{item['section']}**\n{_bullets(item['suggestions'])}" for item in insights["section_suggestions"]
+    )
+
+
+def job_match_markdown(match):
+    return "\n\n".join([
+        f"### Match Score: {match['match_score']}/100",
+        f"### Matched Skills\n{_bullets(match['matched_skills'])}",
+        f"### Missing or Mismatched\n{_bullets(match['missing_skills'])}",
+        f"### Tailoring Tips\n{_bullets(match['tailoring_tips'])}",
+    ])
+
+
+def revision_review_markdown(review):
+    return "\n\n".join([
+        review["summary"],
+        f"### What Improved\n{_bullets(review['improved'])}",
+        f"### What Got Worse\n{_bullets(review['regressed'])}",
+        f"### Next Steps\n{_bullets(review['next_steps'])}",
+    ])
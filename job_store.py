@@ -0,0 +1,239 @@
+"""Local store for scraped job listings, searchable with SQLite FTS5.
+
+Searches are answered from the index when the same (or a similar) query was
+scraped recently; stale queries are served from the index while a background
+scrape refreshes them. Popular queries can be pre-warmed from a scheduled job:
+
+    python job_store.py prewarm "Data Scientist" "Frontend Developer"
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from cache import CACHE_DIR
+from matcher import stem
+
+JOB_STORE_PATH = os.getenv("RESUMEPRO_JOB_STORE", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_MAX_AGE = float(os.getenv("RESUMEPRO_JOB_MAX_AGE", str(6 * 3600)))  # six hours
+
+JOB_FIELDS = ("title", "company", "location", "link", "description")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    title TEXT, company TEXT, location TEXT, description TEXT,
+    first_seen REAL NOT NULL, last_seen REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, location, description,
+    content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    VALUES (new.id, new.title, new.company, new.location, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    VALUES (new.id, new.title, new.company, new.location, new.description);
+END;
+CREATE TABLE IF NOT EXISTS queries (
+    query_key TEXT NOT NULL, location TEXT NOT NULL, query TEXT NOT NULL,
+    fetched REAL NOT NULL, results INTEGER NOT NULL,
+    PRIMARY KEY (query_key, location)
+);
+"""
+
+
+def query_key(query):
+    # "Data Scientists" and "scientist data" share freshness
+    return " ".join(sorted(stem(word) for word in re.findall(r"\w+", query.lower())))
+
+
+def _fts_query(text):
+    words = re.findall(r"\w+", text)
+    return " AND ".join(f'"{word}"*' for word in words)
+
+
+def normalize_link(link):
+    return link.split("?", 1)[0].rstrip("/")
+
+
+class JobStore:
+    """Job listings deduplicated by link, with first/last-seen timestamps."""
+
+    def __init__(self, path=JOB_STORE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+    def ingest(self, jobs, query=None, location="", now=None):
+        """Bulk upsert scraped job dicts; optionally mark query as freshly fetched.
+
+        Returns the number of jobs written.
+        """
+        now = time.time() if now is None else now
+        rows = [
+            {**{field: job.get(field) for field in JOB_FIELDS}, "link": normalize_link(job["link"]), "now": now}
+            for job in jobs if job.get("link")
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO jobs (link, title, company, location, description, first_seen, last_seen) "
+                "VALUES (:link, :title, :company, :location, :description, :now, :now) "
+                "ON CONFLICT (link) DO UPDATE SET title = excluded.title, company = excluded.company, "
+                "location = excluded.location, description = excluded.description, last_seen = excluded.last_seen",
+                rows,
+            )
+            if query is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO queries (query_key, location, query, fetched, results) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (query_key(query), location.lower(), query, now, len(rows)),
+                )
+            self._db.commit()
+        return len(rows)
+
+    def search(self, text, location="", limit=50):
+        """Best-matching stored jobs for a free-text query (prefix and stem matching)."""
+        match = _fts_query(text)
+        if not match:
+            return []
+        if location:
+            match = f"({match}) AND location : ({_fts_query(location)})"
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT jobs.title, jobs.company, jobs.location, jobs.link, jobs.description, jobs.last_seen "
+                "FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid "
+                "WHERE jobs_fts MATCH ? ORDER BY bm25(jobs_fts, 10.0, 2.0, 1.0, 1.0) LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def fetched_at(self, query, location=""):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched FROM queries WHERE query_key = ? AND location = ?",
+                (query_key(query), location.lower()),
+            ).fetchone()
+        return row["fetched"] if row else None
+
+    def stats(self):
+        with self._lock:
+            (jobs,) = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()
+            (queries,) = self._db.execute("SELECT COUNT(*) FROM queries").fetchone()
+        return {"jobs": jobs, "queries": queries}
+
+
+_store = None
+_store_lock = threading.Lock()
+_refreshing = set()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+    return _store
+
+
+def refresh(query, location="", max_results=50, store=None, **scrape_options):
+    """Scrape a query live and store the results. Returns the scraped jobs."""
+    store = store or get_store()
+    from scraper import iter_linkedin_jobs  # Selenium is only loaded when a search needs scraping
+    jobs = list(iter_linkedin_jobs(query, location, max_results, **scrape_options))
+    store.ingest(jobs, query=query, location=location)
+    return jobs
+
+
+def _refresh_in_background(query, location, max_results, store):
+    key = (query_key(query), location.lower())
+    with _store_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            refresh(query, location, max_results, store)
+        except Exception:
+            pass  # the stale results stay in place; the next search retries
+        finally:
+            with _store_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, daemon=True, name=f"job-refresh:{query}").start()
+
+
+def iter_jobs(query, location="", max_results=50, max_age=JOB_MAX_AGE, min_similar=10, store=None):
+    """Yield jobs for a search, from the local index when possible.
+
+    - query fetched within max_age: answered from the index only
+    - fetched earlier, or never fetched but at least min_similar indexed jobs match
+      (e.g. from a similar query): answered from the index, refreshed by a background scrape
+    - otherwise: scraped live, stored, and yielded as they arrive
+    """
+    store = store or get_store()
+    fetched = store.fetched_at(query, location)
+    cached = store.search(query, location, limit=max_results)
+    if cached and (fetched is not None or len(cached) >= min_similar):
+        if fetched is None or time.time() - fetched > max_age:
+            _refresh_in_background(query, location, max_results, store)
+        yield from cached
+        return
+
+    from scraper import iter_linkedin_jobs
+
+    scraped = []
+    completed = False
+    try:
+        for job in iter_linkedin_jobs(query, location, max_results):
+            scraped.append(job)
+            yield job
+        completed = True
+    finally:
+        # Keep whatever was scraped, but only a full scrape counts as fresh
+        store.ingest(scraped, query=query if completed else None, location=location)
+
+
+def prewarm(queries, location="", max_results=50, store=None):
+    """Scrape and store each query in turn. Returns {query: jobs stored}."""
+    store = store or get_store()
+    return {query: len(refresh(query, location, max_results, store)) for query in queries}
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Manage the local job-listing store.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    warm = commands.add_parser("prewarm", help="scrape and index popular queries")
+    warm.add_argument("queries", nargs="+")
+    warm.add_argument("--location", default="")
+    warm.add_argument("--max-results", type=int, default=50)
+    search = commands.add_parser("search", help="query the local index")
+    search.add_argument("text")
+    search.add_argument("--location", default="")
+    search.add_argument("--limit", type=int, default=20)
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "prewarm":
+        for query, count in prewarm(args.queries, args.location, args.max_results).items():
+            print(f"{query}: {count} job(s) stored")
+    else:
+        for job in get_store().search(args.text, args.location, args.limit):
+            print(f"{job['title']} | {job['company']} | {job['location']} | {job['link']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+HIGHLIGHT_TEMPLATE = '<span style="background-color:#d1fae5;"><b>{}</b></span>'
+
+_TOKEN = re.compile(r"\w+")
+
+# Never start or end a multi-word JD phrase on one of these
+_PHRASE_STOPWORDS = {
+    "about", "also", "able", "been", "being", "each", "from", "have", "into", "more", "must",
+    "other", "over", "should", "such", "than", "that", "their", "them", "they", "this",
+    "were", "what", "when", "where", "which", "while", "will", "with", "would", "your",
+}
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Light suffix-stripping stemmer: plurals, -ing/-ed and a trailing e."""
+    w = word.lower()
+    if len(w) <= 3:
+        return w
+    if w.endswith("ies") and len(w) > 4:
+        w = w[:-3] + "y"
+    elif w.endswith("sses"):
+        w = w[:-2]
+    elif w.endswith("s") and not w.endswith(("ss", "us", "is")):
+        w = w[:-1]
+    if w.endswith("ing") and len(w) > 5:
+        w = w[:-3]
+    elif w.endswith("ed") and len(w) > 4:
+        w = w[:-2]
+    if w.endswith("e") and len(w) > 4:
+        w = w[:-1]
+    return w
+
+
+def tokenize(text, use_stem=True):
+    """Return (start, end, normalized token) for every word in text."""
+    norm = stem if use_stem else str.lower
+    return [(m.start(), m.end(), norm(m.group())) for m in _TOKEN.finditer(text)]
+
+
+def extract_jd_terms(jd_text, min_count=2, min_length=4, phrases=True, use_stem=True):
+    """Terms repeated at least min_count times in the job description: words of at
+    least min_length characters and, optionally, two-word phrases. Word forms that
+    share a stem are counted together."""
+    norm = stem if use_stem else str.lower
+    words = [w.lower() for w in _TOKEN.findall(jd_text)]
+    stems = [norm(w) for w in words]
+
+    surface = {}  # stem -> first surface form seen, used as the displayed term
+    for word, key in zip(words, stems):
+        surface.setdefault(key, word)
+
+    counts = Counter(key for word, key in zip(words, stems) if len(word) >= min_length)
+    terms = [surface[key] for key, count in counts.items() if count >= min_count]
+
+    if phrases:
+        bigrams = Counter()
+        first_seen = {}
+        for i in range(len(words) - 1):
+            a, b = words[i], words[i + 1]
+            if len(a) < min_length or len(b) < min_length or a in _PHRASE_STOPWORDS or b in _PHRASE_STOPWORDS:
+                continue
+            key = (stems[i], stems[i + 1])
+            bigrams[key] += 1
+            first_seen.setdefault(key, f"{a} {b}")
+        terms.extend(first_seen[key] for key, count in bigrams.items() if count >= min_count)
+    return terms
+
+
+class KeywordMatcher:
+    """Matches a fixed set of words and phrases against text in one pass over its tokens.
+
+    Terms are indexed by their first (stemmed) token; at each resume token only the
+    phrases starting with it are checked, longest first, so cost is independent of
+    the number of terms.
+    """
+
+    def __init__(self, terms, use_stem=True):
+        self.use_stem = use_stem
+        self.terms = list(dict.fromkeys(terms))
+        self._index = {}
+        keys = {}
+        for term in self.terms:
+            key = tuple(token for _, _, token in tokenize(term, use_stem))
+            if key:
+                keys[term] = key
+                self._index.setdefault(key[0], []).append((key, term))
+        # A phrase match also counts as a match for any single-word terms inside it
+        singles = {key[0]: term for term, key in keys.items() if len(key) == 1}
+        self._components = {
+            term: [singles[token] for token in key if token in singles]
+            for term, key in keys.items() if len(key) > 1
+        }
+        for candidates in self._index.values():
+            candidates.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def find(self, text, tokens=None):
+        """Non-overlapping (start, end, term) spans, leftmost-longest."""
+        tokens = tokenize(text, self.use_stem) if tokens is None else tokens
+        spans = []
+        i = 0
+        while i < len(tokens):
+            candidates = self._index.get(tokens[i][2])
+            matched = 0
+            if candidates:
+                for key, term in candidates:
+                    n = len(key)
+                    if n == 1 or tuple(token for _, _, token in tokens[i:i + n]) == key:
+                        spans.append((tokens[i][0], tokens[i + n - 1][1], term))
+                        matched = n
+                        break
+            i += matched or 1
+        return spans
+
+    def highlight(self, text, spans=None, template=HIGHLIGHT_TEMPLATE):
+        spans = self.find(text) if spans is None else spans
+        pieces = []
+        last = 0
+        for start, end, _ in spans:
+            pieces.append(text[last:start])
+            pieces.append(template.format(text[start:end]))
+            last = end
+        pieces.append(text[last:])
+        return "".join(pieces)
+
+    def match(self, text):
+        """Structured result shared by the UI and batch paths.
+
+        Returns {"html", "spans": [{"offset", "end", "term", "text"}], "counts": {term: n}}.
+        """
+        spans = self.find(text)
+        counts = Counter()
+        for _, _, term in spans:
+            counts[term] += 1
+            counts.update(self._components.get(term, ()))
+        return {
+            "html": self.highlight(text, spans),
+            "spans": [{"offset": start, "end": end, "term": term, "text": text[start:end]}
+                      for start, end, term in spans],
+            "counts": {term: counts[term] for term in self.terms if counts[term]},
+        }
@@ -1,25 +1,182 @@
-import PyPDF2
-import docx
+import hashlib
+import importlib
+import importlib.util
+import mmap
 import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
 
-def parse_resume(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+from cache import CACHE_ENABLED, TieredCache, make_key
+import telemetry
+
+# Backend name -> module. Parser modules are imported on first use, so start-up
+# never pays for a format nobody has uploaded yet.
+PDF_BACKENDS = {"pypdf2": "PyPDF2"}
+if importlib.util.find_spec("pypdf") is not None:
+    PDF_BACKENDS["pypdf"] = "pypdf"  # newer and faster successor of PyPDF2
+DEFAULT_PDF_BACKEND = "pypdf" if "pypdf" in PDF_BACKENDS else "pypdf2"
+
+# Documents shorter than this are extracted serially; worker start-up would dominate
+PARALLEL_MIN_PAGES = 8
+PDF_WORKERS = int(os.getenv("RESUMEPRO_PDF_WORKERS", "1"))
+PDF_MAX_PAGES = int(os.getenv("RESUMEPRO_PDF_MAX_PAGES", "0")) or None
+
+ERROR_PREFIXES = ("Error extracting", "Unsupported file format")
+
+# Parsed PDF pages are separated by a line holding only a form feed (as pdftotext
+# does), so preprocess.clean_text can tell page headers/footers from body lines
+PAGE_BREAK = "\f"
+_PAGE_BREAKS = re.compile(r"\n*(?:\f\n*)+")
+
+# Parsed text and metadata keyed by the SHA-256 of the file content
+parse_cache = TieredCache("parses", max_disk_entries=2000)
+
+def _read_source(source, filename=None):
+    """Return (content bytes, filename) for a path, bytes or a file-like object."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source), filename
+    if hasattr(source, "read"):
+        if hasattr(source, "getvalue"):
+            content = source.getvalue()
+        else:
+            source.seek(0)
+            content = source.read()
+        return content, filename or getattr(source, "name", None)
+    with open(source, "rb") as f:
+        return f.read(), filename or os.fspath(source)
+
+def normalize_text(text):
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(line if line == PAGE_BREAK else line.rstrip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+def without_page_breaks(text):
+    """text with its PAGE_BREAK lines turned into blank lines, for display."""
+    return _PAGE_BREAKS.sub("\n\n", text).strip() if PAGE_BREAK in text else text
+
+def parse_document(source, filename=None, use_cache=True, page_breaks=False):
+    """Parse a resume given as a path, bytes or file-like object (filename supplies the
+    extension for bytes). No temporary file is written.
+
+    Returns {"text", "format", "pages", "extraction_time", "backend", "sha256", "cached"}.
+    PDF pages are separated by blank lines; page_breaks=True separates them with
+    PAGE_BREAK lines instead, for text that goes through preprocess.clean_text.
+    Successful results are cached by content hash, in memory and on disk.
+    """
+    content, filename = _read_source(source, filename)
+    ext = os.path.splitext(filename or "")[1].lower()
+    with telemetry.span("parse", format=ext, bytes=len(content)) as span:
+        result = _parse_content(content, ext, use_cache)
+        span.set(cached=result["cached"], pages=result["pages"] or 0, chars=len(result["text"]))
+    if not page_breaks:
+        result = dict(result, text=without_page_breaks(result["text"]))
+    return result
+
+def _parse_content(content, ext, use_cache):
+    digest = hashlib.sha256(content).hexdigest()
+    backend = DEFAULT_PDF_BACKEND if ext == ".pdf" else ext.lstrip(".")
+
+    use_cache = use_cache and CACHE_ENABLED
+    key = make_key(digest, ext, backend, PDF_MAX_PAGES)
+    if use_cache:
+        cached = parse_cache.get(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+    start = time.perf_counter()
+    pages = None
     if ext == ".pdf":
-        return extract_text_from_pdf(file_path)
+        try:
+            page_texts = extract_pdf_pages(content, max_pages=PDF_MAX_PAGES, workers=PDF_WORKERS)
+            text, pages = f"\n{PAGE_BREAK}\n".join(page_texts), len(page_texts)
+        except Exception as e:
+            text = f"Error extracting PDF text: {str(e)}"
     elif ext == ".docx":
-        return extract_text_from_docx(file_path)
+        text = extract_text_from_docx(BytesIO(content))
     elif ext == ".txt":
-        return extract_text_from_txt(file_path)
+        text = extract_text_from_txt(content)
     else:
-        return "Unsupported file format."
+        text = "Unsupported file format."
 
-def extract_text_from_pdf(file_path):
-    text = ""
+    result = {
+        "text": text, "format": ext, "pages": pages,
+        "extraction_time": time.perf_counter() - start,
+        "backend": backend, "sha256": digest, "cached": False,
+    }
+    if not text.startswith(ERROR_PREFIXES):
+        result["text"] = normalize_text(text)
+        if use_cache:
+            parse_cache.set(key, result)
+    return result
+
+def parse_resume(source, filename=None, use_cache=True, page_breaks=False):
+    return parse_document(source, filename, use_cache, page_breaks)["text"]
+
+@contextmanager
+def _pdf_stream(source):
+    # Paths are memory-mapped; content already in memory is wrapped as-is
+    if isinstance(source, (bytes, bytearray)):
+        yield BytesIO(source)
+    else:
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+def _pdf_reader(stream, backend):
+    return importlib.import_module(PDF_BACKENDS[backend]).PdfReader(stream)
+
+def iter_pdf_pages(file_path, backend=DEFAULT_PDF_BACKEND, max_pages=None, start=0):
+    """Yield the text of each page of a PDF path (read through a memory map) or bytes.
+
+    Stops after max_pages pages, so callers that only need the first few pages
+    never parse the rest.
+    """
+    with _pdf_stream(file_path) as data:
+        pages = _pdf_reader(data, backend).pages
+        stop = len(pages) if max_pages is None else min(len(pages), start + max_pages)
+        for index in range(start, stop):
+            yield pages[index].extract_text() or ""
+
+def _extract_page_range(file_path, backend, start, stop):
+    return list(iter_pdf_pages(file_path, backend, max_pages=stop - start, start=start))
+
+def count_pdf_pages(file_path, backend=DEFAULT_PDF_BACKEND):
+    with _pdf_stream(file_path) as data:
+        return len(_pdf_reader(data, backend).pages)
+
+def extract_pdf_pages(file_path, backend=DEFAULT_PDF_BACKEND, max_pages=None, workers=1):
+    """Return the text of each page as a list.
+
+    With workers > 1, long documents are split into contiguous page ranges that
+    are extracted in separate processes and reassembled in order.
+    """
+    with telemetry.span("pdf_extract", backend=backend) as span:
+        pages = _extract_pdf_pages(file_path, backend, max_pages, workers)
+        span.set(pages=len(pages), chars=sum(map(len, pages)))
+    return pages
+
+def _extract_pdf_pages(file_path, backend, max_pages, workers):
+    if workers <= 1:
+        return list(iter_pdf_pages(file_path, backend, max_pages))
+
+    total = count_pdf_pages(file_path, backend)
+    if max_pages is not None:
+        total = min(total, max_pages)
+    if total < PARALLEL_MIN_PAGES:
+        return list(iter_pdf_pages(file_path, backend, max_pages))
+
+    chunk = -(-total // workers)  # ceiling division
+    ranges = [(start, min(start + chunk, total)) for start in range(0, total, chunk)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(_extract_page_range, file_path, backend, start, stop) for start, stop in ranges]
+        return [page for future in futures for page in future.result()]
+
+def extract_text_from_pdf(file_path, backend=DEFAULT_PDF_BACKEND, max_pages=None, workers=1):
     try:
-        with open(file_path, "rb") as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            for page in pdf_reader.pages:
-                text += page.extract_text() or ""
+        # One join at the end instead of repeated string concatenation
+        text = "\n".join(extract_pdf_pages(file_path, backend, max_pages, workers))
     except Exception as e:
         text = f"Error extracting PDF text: {str(e)}"
     return text
@@ -27,6 +184,7 @@ def extract_text_from_pdf(file_path):
 def extract_text_from_docx(file_path):
     text = ""
     try:
+        import docx  # python-docx, only needed for .docx uploads
         doc = docx.Document(file_path)
         text = "\n".join([para.text for para in doc.paragraphs])
     except Exception as e:
@@ -36,6 +194,8 @@ def extract_text_from_docx(file_path):
 def extract_text_from_txt(file_path):
     text = ""
     try:
+        if isinstance(file_path, (bytes, bytearray)):
+            return bytes(file_path).decode("utf-8")
         with open(file_path, "r", encoding="utf-8") as f:
             text = f.read()
     except Exception as e:
@@ -0,0 +1,205 @@
+"""Prompt-size control: clean extracted text, split it into sections and fit it to a token budget."""
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+import client
+from ats_rules import default_rules
+from parser import PAGE_BREAK
+
+# Invisible characters PDF extraction leaves behind
+_INVISIBLE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\u00ad\u200b-\u200d\u2060\ufeff]")
+_BULLET = re.compile("^[\u2022\u25cf\u25aa\u25e6\u25a0\u2023\u2043\u2219*]\\s*")
+_PAGE_MARKER = re.compile(r"(?i)^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$")
+_HYPHENATED_BREAK = re.compile(r"([a-z])-\n([a-z])")  # "develop-\nment", not "2019-\n2020"
+EDGE_LINES = 2  # non-blank lines at the top and bottom of a page that may be a header/footer
+# Words a heading may add around a section name, e.g. "Professional Experience", "Skills & Tools"
+_HEADING_PREFIX = r"(?:(?:professional|work|relevant|technical|core|key|academic|personal|selected|other|additional)\s+)*"
+_HEADING_SUFFIX = r"(?:\s+(?:information|info|details|highlights)|\s*(?:&|and)\s+\w+)?"
+
+TRUNCATION_MARKER = "[...]"
+
+
+def _page_edges(page):
+    lines = [line for line in page if line and len(line) <= 80]
+    return set(lines[:EDGE_LINES]), set(lines[-EDGE_LINES:])
+
+
+def _drop_page_numbers(page):
+    # Only among a page's edge lines: elsewhere a number-only line is content
+    content = [i for i, line in enumerate(page) if line]
+    edges = set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+    return [line for i, line in enumerate(page) if i not in edges or not _PAGE_MARKER.match(line)]
+
+
+def _page_furniture(pages):
+    """Lines repeated at the top, or at the bottom, of at least half the pages (and two or more)."""
+    if len(pages) < 2:
+        return set()
+    tops, bottoms = Counter(), Counter()
+    for page in pages:
+        top, bottom = _page_edges(page)
+        tops.update(top)
+        bottoms.update(bottom)
+    threshold = max(2, len(pages) / 2)
+    return {line for counts in (tops, bottoms) for line, count in counts.items() if count >= threshold}
+
+
+def clean_text(text):
+    """Normalize whitespace and strip common extraction artifacts.
+
+    Removes invisible characters, ligatures and line-break hyphenation, and collapses
+    runs of spaces and blank lines. When the text has page breaks (see
+    parser.PAGE_BREAK), page numbers at the top or bottom of a page are removed and
+    page headers/footers are kept on their first page only; body lines are never
+    deduplicated, so repeated job titles and bullets survive.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    pages = []
+    for page in text.split(PAGE_BREAK):  # split first: _INVISIBLE removes form feeds
+        page = _HYPHENATED_BREAK.sub(r"\1\2", unicodedata.normalize("NFKC", _INVISIBLE.sub("", page)))
+        lines = [_BULLET.sub("- ", " ".join(line.split())) for line in page.split("\n")]
+        pages.append(lines)
+    if len(pages) > 1:
+        pages = [_drop_page_numbers(page) for page in pages]
+    furniture = _page_furniture(pages)
+
+    cleaned = []
+    seen = set()
+    for page in pages:
+        edges = set.union(*_page_edges(page))
+        for line in page:
+            if line in furniture and line in edges:
+                if line in seen:
+                    continue
+                seen.add(line)
+            if not line and cleaned and not cleaned[-1]:
+                continue  # runs of blank lines
+            cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+@lru_cache(maxsize=8)
+def _heading_patterns(headings):
+    # The ATS section patterns, anchored: the whole title must name the section
+    return [
+        (name, re.compile(rf"{_HEADING_PREFIX}(?:{regex.pattern}){_HEADING_SUFFIX}\s*:?", re.IGNORECASE))
+        for name, regex in headings
+    ]
+
+
+def _heading(line, headings):
+    # Headings are short lines without contact details, e.g. "WORK EXPERIENCE:" or "## Skills".
+    # List items never are, even when they name a section ("- Improved customer experience")
+    if line.lstrip().startswith(("-", "*", "\u2022")):
+        return None
+    title = line.strip("#=_| ")
+    if not title or len(title) > 40 or len(title.split()) > 4 or re.search(r"[@\d]", title):
+        return None
+    for name, regex in _heading_patterns(tuple(headings)):
+        if regex.fullmatch(title):
+            return name
+    return None
+
+
+def split_sections(text, rules=None):
+    """Split resume text into [{"name", "heading", "body"}] using the ATS section patterns.
+
+    Text before the first heading (name, contact details) becomes a "Header" section.
+    """
+    headings = (rules or default_rules()).headings
+    sections = [{"name": "Header", "heading": "", "lines": []}]
+    for line in text.split("\n"):
+        # "Skills: Python, SQL" is a heading with its content on the same line
+        head, _, rest = line.partition(":")
+        name = _heading(head, headings)
+        if name:
+            inline = bool(rest.strip())
+            sections.append({"name": name, "heading": "" if inline else line, "lines": [line] if inline else []})
+        else:
+            sections[-1]["lines"].append(line)
+    return [
+        {"name": section["name"], "heading": section["heading"], "body": "\n".join(section["lines"]).strip()}
+        for section in sections if section["heading"] or any(section["lines"])
+    ]
+
+
+def render_sections(sections, sectioned=False):
+    """Join sections back into text; sectioned=True labels each one as "[Name]" above its heading."""
+    parts = []
+    for section in sections:
+        label = f"[{section['name']}]" if sectioned else ""
+        parts.append("\n".join(part for part in (label, section["heading"], section["body"]) if part))
+    return "\n\n".join(parts)
+
+
+def _truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    # Prefer ending on a whole line, then on a whole word
+    boundary = cut.rfind("\n")
+    if boundary < limit // 2:
+        boundary = cut.rfind(" ")
+    return (cut[:boundary] if boundary > 0 else cut).rstrip() + f"\n{TRUNCATION_MARKER}"
+
+
+def _water_level(lengths, total):
+    """Largest per-item cap such that sum(min(length, cap)) <= total."""
+    remaining = total
+    ordered = sorted(lengths)
+    for i, length in enumerate(ordered):
+        share = remaining // (len(ordered) - i)
+        if length > share:
+            return share
+        remaining -= length
+    return max(ordered, default=0)
+
+
+def fit_sections(sections, budget, model_name=client.DEFAULT_MODEL, sectioned=False):
+    """Trim section bodies until the rendered text fits in budget tokens.
+
+    The longest sections are trimmed first (to an equal cap), so short sections such
+    as Contact or Skills survive intact. Sizes are planned in characters from the
+    measured characters-per-token and checked with the model's count_tokens.
+    Returns (text, tokens).
+    """
+    text = render_sections(sections, sectioned)
+    tokens = client.count_tokens(text, model_name)
+    for _ in range(3):
+        if not budget or tokens <= budget:
+            break
+        overhead = len(text) - sum(len(section["body"]) for section in sections)
+        chars = max(0, int((len(text) * budget / tokens) * 0.97) - overhead)
+        cap = _water_level([len(section["body"]) for section in sections], chars)
+        sections = [dict(section, body=_truncate(section["body"], cap)) for section in sections]
+        text = render_sections(sections, sectioned)
+        tokens = client.count_tokens(text, model_name)
+    return text, tokens
+
+
+def compact(text, budget=None, model_name=client.DEFAULT_MODEL, sectioned=False):
+    """Clean, segment and budget one prompt input.
+
+    Returns {"text", "sections", "original_tokens", "tokens", "saved"}; budget=None
+    or 0 only cleans, and its token counts are local estimates (only logged, so not
+    worth a count_tokens round trip).
+    """
+    sections = split_sections(clean_text(text))
+    if not budget:
+        compacted = render_sections(sections, sectioned)
+        original_tokens, tokens = client.estimate_tokens(text), client.estimate_tokens(compacted)
+    else:
+        original_tokens = client.count_tokens(text, model_name)
+        compacted = render_sections(sections, sectioned)
+        if original_tokens <= budget and len(compacted) <= len(text):
+            # Nothing to cut: the cleaned text is no longer than the original, which fits.
+            # Its count is scaled from the original's rather than measured again
+            tokens = original_tokens * len(compacted) // max(len(text), 1)
+        else:
+            compacted, tokens = fit_sections(sections, budget, model_name, sectioned)
+    return {
+        "text": compacted, "sections": [section["name"] for section in sections],
+        "original_tokens": original_tokens, "tokens": tokens, "saved": original_tokens - tokens,
+    }
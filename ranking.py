@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+
+from analyzer import compare_with_job_description, submit_ai_call
+from matcher import tokenize
+
+
+def job_text(job):
+    return "\n".join(job.get(field) or "" for field in ("title", "company", "location", "description"))
+
+
+def _index_text(job):
+    # Title words are repeated so they weigh more than boilerplate in the description
+    return " ".join([job.get("title") or ""] * 2 + [job.get("company") or "", job.get("description") or ""])
+
+
+def _terms(text):
+    return [token for _, _, token in tokenize(text)]
+
+
+class JobIndex:
+    """TF-IDF (or BM25-weighted) vectors for a list of job dicts, stored CSR-style in NumPy.
+
+    Uses the same stemmed tokenization as highlight_resume_vs_jd. Scoring a resume
+    touches only the non-zero entries, so thousands of listings rank in milliseconds.
+    """
+
+    def __init__(self, jobs, method="tfidf", k1=1.2, b=0.75):
+        self.jobs = list(jobs)
+        self.method = method
+        self.vocabulary = {}
+        docs = []
+        for job in self.jobs:
+            counts = {}
+            for term in _terms(_index_text(job)):
+                index = self.vocabulary.setdefault(term, len(self.vocabulary))
+                counts[index] = counts.get(index, 0) + 1
+            docs.append(counts)
+
+        lengths = np.array([sum(counts.values()) for counts in docs], dtype=np.float64)
+        self.indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+        self.indptr[1:] = np.cumsum([len(counts) for counts in docs])
+        self.indices = np.fromiter((i for counts in docs for i in counts), dtype=np.int64, count=self.indptr[-1])
+        tf = np.fromiter((c for counts in docs for c in counts.values()), dtype=np.float64, count=self.indptr[-1])
+
+        df = np.bincount(self.indices, minlength=len(self.vocabulary)).astype(np.float64)
+        self.idf = np.log((len(docs) + 1) / (df + 1)) + 1
+
+        if method == "bm25":
+            avg_length = lengths.mean() if len(lengths) else 0.0
+            doc_length = np.repeat(lengths, np.diff(self.indptr))
+            weight = tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_length / max(avg_length, 1.0)))
+        else:
+            weight = 1 + np.log(tf)  # sublinear term frequency
+        self.data = weight * self.idf[self.indices]
+
+        # Row of each stored entry, so per-job sums are a single bincount
+        self.rows = np.repeat(np.arange(len(docs)), np.diff(self.indptr))
+        self.norms = np.sqrt(np.bincount(self.rows, weights=self.data ** 2, minlength=len(docs)))
+
+    def _query_vector(self, text):
+        query = np.zeros(len(self.vocabulary))
+        counts = {}
+        for term in _terms(text):
+            index = self.vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        for index, count in counts.items():
+            query[index] = (1 + math.log(count)) * self.idf[index]
+        return query
+
+    def scores(self, text):
+        """Cosine similarity between text and every job, as an array aligned with self.jobs."""
+        query = self._query_vector(text)
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return np.zeros(len(self.jobs))
+        dots = np.bincount(self.rows, weights=self.data * query[self.indices], minlength=len(self.jobs))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nan_to_num(dots / (self.norms * query_norm))
+
+    def rank(self, text, top_n=None):
+        """Jobs sorted by similarity, each a copy of the job dict with a "similarity" key."""
+        scores = self.scores(text)
+        order = np.argsort(-scores, kind="stable")
+        if top_n is not None:
+            order = order[:top_n]
+        return [dict(self.jobs[i], similarity=round(float(scores[i]), 4)) for i in order]
+
+
+def rank_jobs(resume_text, jobs, top_n=None, method="tfidf"):
+    return JobIndex(jobs, method).rank(resume_text, top_n)
+
+
+def compare_top_jobs(resume_text, jobs, top_k=3, method="tfidf"):
+    """Rank locally, then send only the top_k jobs to Gemini for a detailed comparison."""
+    top = rank_jobs(resume_text, jobs, top_k, method)
+    futures = [submit_ai_call(compare_with_job_description, resume_text, job_text(job)) for job in top]
+    for job, future in zip(top, futures):
+        job["ai_comparison"] = future.result()
+    return top
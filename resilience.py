@@ -0,0 +1,193 @@
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+# Sized to the Gemini quota: sustained requests per minute plus a short burst allowance
+RATE_LIMIT_RPM = float(os.getenv("RESUMEPRO_RATE_LIMIT_RPM", "15"))
+RATE_LIMIT_BURST = int(os.getenv("RESUMEPRO_RATE_LIMIT_BURST", "5"))
+MAX_ATTEMPTS = int(os.getenv("RESUMEPRO_MAX_ATTEMPTS", "4"))
+MAX_BACKOFF = float(os.getenv("RESUMEPRO_MAX_BACKOFF", "20"))
+
+
+@functools.lru_cache(maxsize=None)
+def retryable_errors():
+    # Imported on the first failure, not at start-up: google.api_core loads grpc
+    from google.api_core import exceptions as api_exceptions
+    return (
+        api_exceptions.TooManyRequests,      # 429 over HTTP
+        api_exceptions.ResourceExhausted,    # 429 over gRPC
+        api_exceptions.ServiceUnavailable,   # 503
+        api_exceptions.InternalServerError,  # 500
+        api_exceptions.DeadlineExceeded,
+    )
+
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter that tracks queue depth and wait time."""
+
+    def __init__(self, rate_per_minute=RATE_LIMIT_RPM, capacity=RATE_LIMIT_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting for a refill if needed. Returns False on timeout."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        waited = now - start
+                        self.acquired += 1
+                        self.total_wait += waited
+                        self.max_wait = max(self.max_wait, waited)
+                        return True
+                    delay = (1 - self._tokens) / self.rate
+                    if deadline is not None:
+                        if now >= deadline:
+                            return False
+                        delay = min(delay, deadline - now)
+                    self._cond.wait(delay)
+            finally:
+                self.waiting -= 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": self.waiting,
+                "max_queue_depth": self.max_waiting,
+                "acquired": self.acquired,
+                "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+
+class RetryBudget:
+    """Caps retries to a fraction of successful calls so an outage doesn't multiply load."""
+
+    def __init__(self, ratio=0.2, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def record_success(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+limiter = TokenBucket()
+retry_budget = RetryBudget()
+
+_inflight = {}  # request key -> Future shared by every concurrent caller
+_inflight_lock = threading.Lock()
+_counters = {"calls": 0, "coalesced": 0, "retries": 0, "failures": 0}
+
+
+def _count(name):
+    with _inflight_lock:
+        _counters[name] += 1
+
+
+def _should_retry(exc):
+    return isinstance(exc, retryable_errors()) and retry_budget.try_spend()
+
+
+def call_with_resilience(func, key=None, timeout=None, on_retry=None):
+    """Run func() under the rate limiter with jittered exponential backoff.
+
+    Concurrent calls with the same key share a single upstream call and its result
+    (or exception). timeout bounds the time spent waiting for a rate-limit token.
+    """
+    if key is None:
+        return _call(func, timeout, on_retry)
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+        else:
+            _counters["coalesced"] += 1
+    if not leader:
+        return future.result()
+
+    try:
+        result = _call(func, timeout, on_retry)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def _call(func, timeout, on_retry):
+    def attempt():
+        if not limiter.acquire(timeout):
+            raise TimeoutError(f"Waited more than {timeout:.0f}s for Gemini rate-limit capacity")
+        return func()
+
+    def before_sleep(retry_state):
+        _count("retries")
+        if on_retry is not None:
+            on_retry(retry_state.outcome.exception())
+
+    _count("calls")
+    retrying = Retrying(
+        retry=retry_if_exception(_should_retry),
+        wait=wait_random_exponential(multiplier=1, max=MAX_BACKOFF),
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        before_sleep=before_sleep,
+        reraise=True,
+    )
+    try:
+        result = retrying(attempt)
+    except BaseException:
+        _count("failures")
+        raise
+    retry_budget.record_success()
+    return result
+
+
+def stats():
+    """Rate limiter queue depth/wait time plus retry and coalescing counters."""
+    with _inflight_lock:
+        snapshot = dict(_counters)
+        snapshot["inflight"] = len(_inflight)
+    snapshot["retry_budget_exhausted"] = retry_budget.exhausted
+    snapshot.update(limiter.stats())
+    return snapshot
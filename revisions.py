@@ -0,0 +1,150 @@
+"""Section-level diffs between uploads of a resume, for incremental re-analysis.
+
+Users iterate: upload, read the suggestions, edit, re-upload. Each upload becomes
+a version whose sections are fingerprinted; against the previous version, only
+the sections whose text changed are sent to Gemini for a review of the changes.
+Section suggestions are reused for every section an earlier version already has
+them for, and requested for the rest. The ATS score is local and cheap, so it is
+recomputed and compared.
+"""
+import difflib
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+
+from analyzer import get_ats_score, get_section_suggestions, submit_ai_call
+from preprocess import clean_text, split_sections
+
+logger = logging.getLogger(__name__)
+
+# Re-analyse revised uploads incrementally (0 = run the full analysis on every upload)
+INCREMENTAL = os.getenv("RESUMEPRO_INCREMENTAL", "1") != "0"
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def fingerprint(text):
+    # Whitespace and case differences (e.g. from PDF re-extraction) are not edits
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _section_text(section):
+    # The heading line is part of the section: rewording it is an edit too
+    return "\n".join(part for part in (section["heading"], section["body"]) if part)
+
+
+def sections(text):
+    """split_sections() of the cleaned text, each with a "key" (the name, numbered if it
+    repeats) and a "fingerprint" of its heading and body."""
+    seen = Counter()
+    result = []
+    for section in split_sections(clean_text(text)):
+        seen[section["name"]] += 1
+        key = section["name"] if seen[section["name"]] == 1 else f"{section['name']} ({seen[section['name']]})"
+        result.append(dict(section, key=key, fingerprint=fingerprint(_section_text(section))))
+    return result
+
+
+def version(text, previous=None):
+    """A snapshot of one upload: its text, sections, ATS score and feedback, plus the
+    AI results gathered for it ("suggestions": fingerprint -> list, "analysis": markdown).
+
+    The previous version's analysis is carried over until a full analysis of this
+    version replaces it.
+    """
+    score, feedback = get_ats_score(text)
+    return {
+        "text": text, "sections": sections(text), "ats_score": score, "ats_feedback": feedback,
+        "suggestions": {}, "analysis": previous["analysis"] if previous else None,
+    }
+
+
+def diff_sections(previous, current):
+    """Compare two sections() lists by key.
+
+    Returns one entry per section, in the current order with removed sections last:
+    {"key", "name", "status", "before", "after", "diff"}, where diff is a unified line
+    diff of a changed section's heading and body.
+    """
+    before = {section["key"]: section for section in previous}
+    changes = []
+    for section in current:
+        old = before.pop(section["key"], None)
+        if old is None:
+            status, diff = ADDED, ""
+        elif old["fingerprint"] == section["fingerprint"]:
+            status, diff = UNCHANGED, ""
+        else:
+            status = CHANGED
+            lines = difflib.unified_diff(_section_text(old).splitlines(), _section_text(section).splitlines(),
+                                         lineterm="", n=1)
+            diff = "\n".join(line for line in lines if not line.startswith(("---", "+++", "@@")))
+        changes.append({"key": section["key"], "name": section["name"], "status": status,
+                        "before": old["body"] if old else "", "after": section["body"], "diff": diff})
+    for old in before.values():
+        changes.append({"key": old["key"], "name": old["name"], "status": REMOVED,
+                        "before": old["body"], "after": "", "diff": ""})
+    return changes
+
+
+def ats_changes(previous, current):
+    """Score delta and the ATS feedback resolved or introduced between two versions."""
+    return {
+        "before": previous["ats_score"], "after": current["ats_score"],
+        "delta": current["ats_score"] - previous["ats_score"],
+        "resolved": [item for item in previous["ats_feedback"] if item not in current["ats_feedback"]],
+        "new": [item for item in current["ats_feedback"] if item not in previous["ats_feedback"]],
+    }
+
+
+def seed_suggestions(version, resume_insights):
+    """Store the section suggestions of a full (combined) analysis against this version's
+    section fingerprints, matching sections by name, so the next upload can reuse them.
+
+    Sections the model named differently get none here; suggest_sections() requests them.
+    """
+    by_name = {item["section"].strip().lower(): item["suggestions"] for item in resume_insights["section_suggestions"]}
+    for section in version["sections"]:
+        suggestions = by_name.get(section["name"].lower())
+        if suggestions:
+            version["suggestions"].setdefault(section["fingerprint"], suggestions)
+
+
+def suggest_sections(current_sections, known):
+    """Suggestions for every section with a body: reused where known (fingerprint ->
+    suggestions from earlier versions) has them, requested from Gemini for the rest,
+    whether the section changed or no earlier analysis covered it.
+
+    The requests run concurrently on the analyzer's pool. Returns
+    {"suggestions": fingerprint -> list, "reused": [keys], "requested": [keys],
+    "errors": key -> error string}.
+    """
+    result = {"suggestions": {}, "reused": [], "requested": [], "errors": {}}
+    futures = {}
+    keys = {}  # fingerprint -> keys of the sections waiting on its request
+    for section in current_sections:
+        digest = section["fingerprint"]
+        if not section["body"]:
+            continue
+        if digest in known:
+            result["suggestions"][digest] = known[digest]
+            result["reused"].append(section["key"])
+            continue
+        if digest not in futures:
+            futures[digest] = submit_ai_call(get_section_suggestions, section["name"], section["body"])
+        keys.setdefault(digest, []).append(section["key"])
+        result["requested"].append(section["key"])
+    for digest, future in futures.items():
+        suggestions = future.result()
+        if isinstance(suggestions, str):
+            result["errors"].update(dict.fromkeys(keys[digest], suggestions))
+        else:
+            result["suggestions"][digest] = suggestions
+    logger.info("Section suggestions: %d reused, %d requested", len(result["reused"]), len(futures))
+    return result
@@ -1,54 +1,217 @@
-from selenium import webdriver 
+from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-import time
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from contextlib import contextmanager
+from urllib.parse import urlencode
+import atexit
+import os
+import queue
+import threading
 
-def scrape_linkedin_jobs(query, location="", max_results=50):
-    # Setup the driver
+import telemetry
+
+LINKEDIN_JOBS_URL = "https://www.linkedin.com/jobs/search/"
+JOB_CARD_SELECTOR = ".job-card-container"
+
+POOL_SIZE = int(os.getenv("RESUMEPRO_BROWSER_POOL_SIZE", "2"))
+PAGE_TIMEOUT = float(os.getenv("RESUMEPRO_PAGE_TIMEOUT", "10"))
+SCROLL_TIMEOUT = float(os.getenv("RESUMEPRO_SCROLL_TIMEOUT", "5"))
+
+# Images and fonts are never needed to read job cards
+BLOCKED_URL_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+                        "*.woff", "*.woff2", "*.ttf", "*.otf"]
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def get_driver_path():
+    """Resolve the chromedriver binary once per process (CHROMEDRIVER_PATH overrides)."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = os.getenv("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+    return _driver_path
+
+def create_driver():
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")  # Run headless for no GUI
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    driver = webdriver.Chrome(service=Service(get_driver_path()), options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+class DriverPool:
+    """Keeps warmed headless Chrome sessions alive between searches.
+
+    Drivers are created lazily up to size; a session that errors is discarded
+    and replaced on the next acquire.
+    """
+
+    def __init__(self, size=POOL_SIZE, factory=create_driver):
+        self.size = size
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def warm_up(self, count=None):
+        for _ in range(min(count or self.size, self.size)):
+            driver = self._create()
+            if driver is None:
+                break
+            self._idle.put(driver)
+
+    def _create(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
 
-    # LinkedIn job search page
-    url = f"https://www.linkedin.com/jobs/search/?keywords={query}&location={location}"
-    driver.get(url)
-    time.sleep(3)  # Wait for page to load
+    def _discard(self, driver):
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
 
-    job_list = []
-    job_count = 0
+    @contextmanager
+    def driver(self, timeout=None):
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            driver = self._create() or self._idle.get(timeout=timeout)
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                try:
+                    driver.delete_all_cookies()
+                    self._idle.put(driver)
+                except WebDriverException:
+                    self._discard(driver)
+            else:
+                self._discard(driver)
 
-    # Scroll to load more jobs and scrape them
-    while job_count < max_results:
-        # Scrape job details on current page
-        jobs = driver.find_elements(By.CSS_SELECTOR, ".job-card-container")
-        for job in jobs:
+    def close(self):
+        while True:
             try:
-                title = job.find_element(By.CSS_SELECTOR, ".job-card-list__title").text
-                company = job.find_element(By.CSS_SELECTOR, ".job-card-container__company-name").text
-                location = job.find_element(By.CSS_SELECTOR, ".job-card-container__metadata-item").text
-                link = job.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-                description = job.find_element(By.CSS_SELECTOR, ".job-card-list__description").text
-                job_list.append({
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "link": link,
-                    "description": description
-                })
-                job_count += 1
-                if job_count >= max_results:
-                    break
-            except Exception as e:
-                continue
-
-        if job_count >= max_results:
-            break
-
-        # Scroll down the page to load more jobs
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)  # Wait for more jobs to load
-
-    driver.quit()
-    return job_list
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.close)
+
+# Reads the cards at the given indices plus every card from index `start` onwards
+# in one round-trip, instead of five find_element calls per card. Missing fields
+# come back as null (e.g. cards the page has not rendered yet).
+_READ_NEW_CARDS_JS = """
+const all = document.querySelectorAll(arguments[0]);
+const indices = arguments[2].concat(Array.from({length: Math.max(0, all.length - arguments[1])}, (_, i) => arguments[1] + i));
+const text = (card, selector) => {
+    const el = card.querySelector(selector);
+    return el ? el.innerText.trim() : null;
+};
+return indices.filter(i => i < all.length).map(i => {
+    const card = all[i];
+    const anchor = card.querySelector("a");
+    return {
+        index: i,
+        id: card.getAttribute("data-job-id") || card.getAttribute("data-occludable-job-id"),
+        title: text(card, ".job-card-list__title"),
+        company: text(card, ".job-card-container__company-name"),
+        location: text(card, ".job-card-container__metadata-item"),
+        link: anchor ? anchor.href : null,
+        description: text(card, ".job-card-list__description"),
+    };
+});
+"""
+
+JOB_FIELDS = ("title", "company", "location", "link", "description")
+
+def _cards_more_than(count):
+    def condition(driver):
+        return driver.execute_script(
+            "return document.querySelectorAll(arguments[0]).length;", JOB_CARD_SELECTOR
+        ) > count
+    return condition
+
+def _job_key(card):
+    # Prefer the job ID; otherwise the link without tracking parameters
+    return card["id"] or card["link"].split("?", 1)[0].rstrip("/")
+
+def iter_linkedin_jobs(query, location="", max_results=50, base_url=LINKEDIN_JOBS_URL, pool=None):
+    """Yield job dicts as they are scraped, deduplicated by job ID/link.
+
+    Each scroll only reads the cards appended since the previous one, and the
+    search stops once a scroll produces no new jobs or max_results is reached.
+    """
+    pool = pool or driver_pool
+    # The span also covers the time the consumer spends between yielded jobs
+    with telemetry.span("scrape", query=query) as span, pool.driver() as driver:
+        # LinkedIn job search page
+        url = f"{base_url}?{urlencode({'keywords': query, 'location': location})}"
+        with telemetry.span("scrape_page_load"):
+            driver.get(url)
+            try:
+                WebDriverWait(driver, PAGE_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+                )
+            except TimeoutException:
+                return
+
+        seen = set()
+        processed = 0  # cards already read from the page
+        incomplete = []  # indices of cards that were not fully rendered when read
+        found = 0
+        while True:
+            cards = driver.execute_script(_READ_NEW_CARDS_JS, JOB_CARD_SELECTOR, processed, incomplete)
+            processed = max([processed] + [card["index"] + 1 for card in cards])
+            incomplete = []
+            new_jobs = 0
+            for card in cards:
+                if not all(card[field] for field in JOB_FIELDS):
+                    incomplete.append(card["index"])
+                    continue
+                key = _job_key(card)
+                if key in seen:
+                    continue
+                seen.add(key)
+                new_jobs += 1
+                found += 1
+                span.set(jobs=found)
+                yield {field: card[field] for field in JOB_FIELDS}
+                if found >= max_results:
+                    return
+            if cards and not new_jobs and not incomplete:
+                return  # the last scroll only brought duplicates
+
+            # Scroll down the page and wait until more job cards have loaded
+            with telemetry.span("scrape_scroll"):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                try:
+                    WebDriverWait(driver, SCROLL_TIMEOUT).until(_cards_more_than(processed))
+                except TimeoutException:
+                    return
+
+def scrape_linkedin_jobs(query, location="", max_results=50, base_url=LINKEDIN_JOBS_URL, pool=None):
+    """Scrape job cards for a search. base_url can point at a local server for offline runs."""
+    return list(iter_linkedin_jobs(query, location, max_results, base_url, pool))
@@ -0,0 +1,203 @@
+"""Background task queue for slow work (Gemini calls, scraping).
+
+app.py submits work here instead of running it in the script body, keeps the task
+ids in session state and polls for results, so a rerun never blocks on an upstream
+call and one server process can serve many sessions.
+"""
+import atexit
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+TASK_WORKERS = int(os.getenv("RESUMEPRO_TASK_WORKERS", "8"))
+TASK_TIMEOUT = float(os.getenv("RESUMEPRO_TASK_TIMEOUT", "180"))
+TASK_RETENTION = float(os.getenv("RESUMEPRO_TASK_RETENTION", "900"))  # finished tasks kept for polling
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+FINISHED = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+_PUBLIC_FIELDS = ("id", "name", "state", "submitted", "started", "finished", "result", "error")
+
+
+class TaskQueue:
+    """A thread pool with a job table: submit, poll, cancel, per-task timeouts and metrics.
+
+    The work is I/O-bound (Gemini, Selenium), so threads are used; CPU-heavy PDF
+    parsing already has its own process pool in parser.py. Python threads cannot be
+    interrupted, so cancellation and timeouts take effect immediately for pollers,
+    stop iterator tasks between items, and discard the result of a blocking call
+    once it returns.
+    """
+
+    def __init__(self, workers=TASK_WORKERS, timeout=TASK_TIMEOUT, retention=TASK_RETENTION):
+        self.workers = workers
+        self.timeout = timeout
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task")
+        self._tasks = {}
+        self._keys = {}  # dedupe key -> task id
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "deduplicated": 0, "started": 0,
+                          DONE: 0, FAILED: 0, CANCELLED: 0, TIMED_OUT: 0, "wait_time": 0.0}
+        self._run_time = 0.0
+        self._runs_ended = 0
+
+    def submit(self, func, *args, name=None, key=None, timeout=None, iterate=False):
+        """Queue func(*args) and return the task id.
+
+        iterate=True means func returns an iterator: items are collected into the
+        task's "partial" list as they arrive (so pollers can show progress) and the
+        result is the full list. While a task with the same key is queued, running or
+        retained as done, its id is returned instead of queuing the work again.
+        """
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            existing = self._tasks.get(self._keys.get(key)) if key is not None else None
+            if existing and existing["state"] in (PENDING, RUNNING, DONE):
+                self._counters["deduplicated"] += 1
+                return existing["id"]
+            task = {
+                "id": uuid.uuid4().hex, "name": name or getattr(func, "__name__", "task"), "key": key,
+                "state": PENDING, "submitted": now, "started": None, "finished": None,
+                "timeout": self.timeout if timeout is None else timeout,
+                "result": None, "error": None, "partial": [], "cancel": threading.Event(),
+            }
+            self._tasks[task["id"]] = task
+            if key is not None:
+                self._keys[key] = task["id"]
+            self._counters["submitted"] += 1
+            task["future"] = self._executor.submit(self._run, task, func, args, iterate)
+        return task["id"]
+
+    def _run(self, task, func, args, iterate):
+        with self._lock:
+            if task["state"] != PENDING:
+                return  # cancelled while queued
+            task["state"] = RUNNING
+            task["started"] = time.time()
+            self._counters["started"] += 1
+            self._counters["wait_time"] += task["started"] - task["submitted"]
+        try:
+            if iterate:
+                iterator = iter(func(*args))
+                try:
+                    for item in iterator:
+                        task["partial"].append(item)
+                        if task["cancel"].is_set():
+                            break
+                        with self._lock:
+                            if self._expired(task, time.time()):
+                                break
+                finally:
+                    close = getattr(iterator, "close", None)
+                    if close:
+                        close()  # runs the generator's cleanup, e.g. returning a pooled browser
+                result = list(task["partial"])
+            else:
+                result = func(*args)
+        except Exception as e:
+            self._finish(task, FAILED, error=str(e) or type(e).__name__)
+            return
+        self._finish(task, DONE, result=result)
+
+    def _finish(self, task, state, result=None, error=None):
+        now = time.time()
+        with self._lock:
+            self._expired(task, now)
+            if task["state"] != RUNNING:
+                return  # cancelled or timed out meanwhile; the result is discarded
+            task.update(state=state, result=result, error=error, finished=now)
+            self._counters[state] += 1
+            self._end_run(task, now)
+
+    def _expired(self, task, now):
+        # Marks a running task that is past its deadline as timed out
+        if task["state"] == RUNNING and task["timeout"] and now - task["started"] > task["timeout"]:
+            task.update(state=TIMED_OUT, finished=now, error=f"Timed out after {task['timeout']:.0f}s")
+            task["cancel"].set()
+            self._counters[TIMED_OUT] += 1
+            self._end_run(task, now)
+            return True
+        return task["state"] == TIMED_OUT
+
+    def _end_run(self, task, now):
+        self._run_time += now - task["started"]
+        self._runs_ended += 1
+
+    def _prune(self, now):
+        for task_id in [task_id for task_id, task in self._tasks.items()
+                        if task["state"] in FINISHED and now - task["finished"] > self.retention]:
+            task = self._tasks.pop(task_id)
+            if self._keys.get(task["key"]) == task_id:
+                del self._keys[task["key"]]
+
+    def status(self, task_id):
+        """Snapshot of a task: id, name, state, timestamps, result, error, partial and
+        elapsed. None for unknown (or pruned) ids."""
+        now = time.time()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            self._expired(task, now)
+            snapshot = {field: task[field] for field in _PUBLIC_FIELDS}
+            snapshot["partial"] = list(task["partial"])
+        snapshot["elapsed"] = (snapshot["finished"] or now) - snapshot["submitted"]
+        return snapshot
+
+    def result(self, task_id, timeout=None):
+        """Block until the task has finished (or timeout seconds pass) and return status()."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            status = self.status(task_id)
+            if status is None or status["state"] in FINISHED:
+                return status
+            if deadline is not None and time.time() >= deadline:
+                return status
+            time.sleep(0.05)
+
+    def cancel(self, task_id):
+        """Cancel a queued or running task. Returns True if it was still unfinished."""
+        now = time.time()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task["state"] in FINISHED or self._expired(task, now):
+                return False
+            if task["state"] == RUNNING:
+                self._end_run(task, now)
+            task["future"].cancel()
+            task["cancel"].set()
+            task.update(state=CANCELLED, finished=now, error="Cancelled")
+            self._counters[CANCELLED] += 1
+        return True
+
+    def metrics(self):
+        """Queue depth, running tasks, per-outcome counters and average wait/run times."""
+        now = time.time()
+        with self._lock:
+            for task in self._tasks.values():
+                self._expired(task, now)
+            states = [task["state"] for task in self._tasks.values()]
+            stats = dict(self._counters)
+            avg_run = self._run_time / self._runs_ended if self._runs_ended else 0.0
+        stats.update(
+            workers=self.workers, pending=states.count(PENDING), running=states.count(RUNNING),
+            retained=len(states), avg_run=avg_run,
+            avg_wait=stats["wait_time"] / stats["started"] if stats["started"] else 0.0,
+        )
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+task_queue = TaskQueue()
+atexit.register(task_queue.shutdown)
@@ -0,0 +1,298 @@
+"""Spans, counters and histograms for the slow stages: PDF extraction, Gemini calls,
+the job scraper's scroll loop and PDF rendering.
+
+Off unless RESUMEPRO_TELEMETRY=1. When off, span() returns a shared no-op object,
+so instrumented code pays one flag check per call.
+
+    with telemetry.span("parse", format=".pdf") as s:
+        ...
+        s.set(pages=3, chars=5120)   # numeric attributes are also summed per span name
+
+Every finished span feeds the resumepro_span_seconds histogram (labels span and
+outcome: ok, error or cancelled). Numeric attributes add to resumepro_span_size_total
+(labels span and unit), and each span is appended to RESUMEPRO_TELEMETRY_FILE as a
+JSON line if set. prometheus_text() renders everything in the Prometheus text
+format; api.py serves it at /metrics/prometheus, and RESUMEPRO_TELEMETRY_PORT
+serves it from a background thread (e.g. for the Streamlit app).
+
+Profiler(name) captures one block with pyinstrument if installed, otherwise cProfile,
+and saves the report under RESUMEPRO_PROFILE_DIR.
+"""
+import cProfile
+import json
+import logging
+import itertools
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import pyinstrument  # optional; nicer call trees than cProfile
+except ImportError:
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("RESUMEPRO_TELEMETRY", "0") != "0"
+TELEMETRY_FILE = os.getenv("RESUMEPRO_TELEMETRY_FILE", "")
+TELEMETRY_PORT = int(os.getenv("RESUMEPRO_TELEMETRY_PORT", "0"))
+PROFILE_DIR = os.getenv("RESUMEPRO_PROFILE_DIR", os.path.join(".cache", "profiles"))
+
+# Upper bounds (seconds) of the duration histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_counters = {}  # (metric name, sorted label items) -> value
+_histograms = {}  # (metric name, sorted label items) -> {"buckets", "sum", "count"}
+_local = threading.local()  # stack of open spans in this thread
+_file = None
+_span_ids = itertools.count(1)
+
+
+def enable(path=None):
+    """Turn recording on, appending spans to path (default RESUMEPRO_TELEMETRY_FILE) if given."""
+    global ENABLED, TELEMETRY_FILE, _file
+    with _lock:
+        if path is not None and path != TELEMETRY_FILE and _file is not None:
+            _file.close()
+            _file = None
+        if path is not None:
+            TELEMETRY_FILE = path
+        ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Forget every recorded counter and histogram."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def increment(name, value=1, **labels):
+    """Add value to the counter name{labels}."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Record value (seconds) in the histogram name{labels}."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _observe(key, value)
+
+
+def _observe(key, value):
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+    for index, bound in enumerate(BUCKETS):
+        if value <= bound:
+            histogram["buckets"][index] += 1
+            break
+    histogram["sum"] += value
+    histogram["count"] += 1
+
+
+def _write(record):
+    global _file
+    if _file is None:
+        if os.path.dirname(TELEMETRY_FILE):
+            os.makedirs(os.path.dirname(TELEMETRY_FILE), exist_ok=True)
+        _file = open(TELEMETRY_FILE, "a", encoding="utf-8", buffering=1)
+    _file.write(json.dumps(record, default=str) + "\n")
+
+
+class Span:
+    """A timed stage. Use span() rather than creating one directly."""
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        self.trace = self.parent.trace if self.parent else f"{random.getrandbits(64):016x}"
+        self.id = next(_span_ids)
+        stack.append(self)
+        self._stack = stack  # exit may run on another thread, e.g. a stream closed by its consumer
+        self.started = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        if self in self._stack:
+            self._stack.remove(self)  # not always the top: spans in generators close out of order
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, Exception):
+            outcome = "error"
+        else:
+            outcome = "cancelled"  # e.g. GeneratorExit from a stream the caller stopped reading
+        with _lock:
+            _observe(_key("resumepro_span_seconds", {"span": self.name, "outcome": outcome}), duration)
+            for unit, value in self.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    key = _key("resumepro_span_size_total", {"span": self.name, "unit": unit})
+                    _counters[key] = _counters.get(key, 0) + value
+            if TELEMETRY_FILE:
+                record = {"trace": self.trace, "id": self.id, "parent": self.parent.id if self.parent else None,
+                          "span": self.name, "start": self.started, "duration": duration, "outcome": outcome}
+                if exc is not None and outcome == "error":
+                    record["error"] = f"{exc_type.__name__}: {exc}"
+                record.update(self.attributes)
+                try:
+                    _write(record)
+                except OSError as e:
+                    logger.warning("Could not write telemetry to %s: %s", TELEMETRY_FILE, e)
+        return False
+
+
+class _NullSpan:
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **attributes):
+    """A context manager timing one stage; a no-op while telemetry is off."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, attributes)
+
+
+def _labels(items, extra=()):
+    items = tuple(items) + tuple(extra)
+    if not items:
+        return ""
+    escape = lambda value: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in items) + "}"
+
+
+def prometheus_text():
+    """Every counter and histogram in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}
+                      for key, h in _histograms.items()}
+    lines = []
+    for metric in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {metric} counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == metric:
+                lines.append(f"{metric}{_labels(labels)} {value}")
+    for metric in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), histogram in sorted(histograms.items()):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram["buckets"]):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_bucket{_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"{metric}_sum{_labels(labels)} {histogram['sum']}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve prometheus_text() at http://host:port/metrics from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="telemetry", daemon=True).start()
+    return server
+
+
+class Profiler:
+    """Profile the current thread between start() and stop(), or over a with block.
+
+    stop() saves the report under PROFILE_DIR (pyinstrument HTML if installed,
+    otherwise a cProfile .prof file for pstats or snakeviz) and returns its path.
+    Work handed to other threads, e.g. the Gemini pool, is not captured.
+    """
+
+    def __init__(self, name="profile", directory=None):
+        self.name = name
+        self.directory = directory or PROFILE_DIR
+        self.path = None
+        self._profiler = pyinstrument.Profiler() if pyinstrument is not None else cProfile.Profile()
+
+    def start(self):
+        if pyinstrument is not None:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def stop(self):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}")
+        if pyinstrument is not None:
+            self._profiler.stop()
+            self.path = base + ".html"
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            self.path = base + ".prof"
+            self._profiler.dump_stats(self.path)
+        logger.info("Saved profile of %s to %s", self.name, self.path)
+        return self.path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+if ENABLED and TELEMETRY_PORT:
+    serve(TELEMETRY_PORT)
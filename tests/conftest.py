@@ -0,0 +1,43 @@
+"""Shared test setup: no network, no disk cache, and a FakeBackend in place of Gemini."""
+import os
+import sys
+
+# Settings are read when the modules are imported, so they are fixed before any import
+os.environ.update({
+    "RESUMEPRO_CACHE": "0",
+    "RESUMEPRO_RATE_LIMIT_RPM": "60000",
+    "RESUMEPRO_RATE_LIMIT_BURST": "1000",
+    "RESUMEPRO_MAX_ATTEMPTS": "1",
+    "RESUMEPRO_MODEL_BACKEND": "gemini",  # each test installs its own backend
+})
+for name in ("GEMINI_API_KEY", "GOOGLE_API_KEY"):
+    os.environ.pop(name, None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import client
+from backends import FakeBackend
+
+RESUME = """Jane Doe
+jane@example.com | 555-0100
+
+Experience
+Software Engineer, Acme Corp
+- Built Python services on AWS
+
+Skills
+Python, SQL, Docker
+
+Education
+BSc Computer Science
+"""
+
+
+@pytest.fixture
+def fake_backend():
+    """An instant FakeBackend; set error_rate on it to simulate outages."""
+    backend = FakeBackend(latency=0.0, jitter=0.0, chunks=4, chunk_delay=0.0, output_words=40, seed=0)
+    client.set_backend(backend)
+    yield backend
+    client.set_backend(None)
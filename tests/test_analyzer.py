@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+import analyzer
+import insights
+from conftest import RESUME
+
+JD = "Python engineer for data services. You will write Python and SQL on AWS; SQL tuning on AWS is a plus."
+
+
+def test_analyze_with_ai(fake_backend):
+    assert analyzer.analyze_with_ai(RESUME).startswith("lorem")
+    assert fake_backend.calls == 1
+
+
+def test_stream_matches_blocking_answer(fake_backend):
+    chunks = list(analyzer.stream_analyze_with_ai(RESUME))
+    assert len(chunks) == fake_backend.chunks
+    assert "".join(chunks) == analyzer.analyze_with_ai(RESUME)
+
+
+def test_errors_come_back_as_strings(fake_backend):
+    fake_backend.error_rate = 1.0
+    result = analyzer.analyze_with_ai(RESUME)
+    assert result.startswith("Error during AI analysis:") and "simulated outage" in result
+    with pytest.raises(Exception, match="simulated outage"):
+        analyzer.analyze_with_ai.raising(RESUME)
+
+
+def test_answers_starting_with_error_are_not_failures(fake_backend):
+    import backends
+    import client
+
+    client.set_backend(backends.StubBackend("Error handling is a strength of this resume."))
+    report = analyzer.run_full_report(RESUME, JD)
+    assert report["errors"] == {}
+    assert report["rewritten_resume"].startswith("Error handling")
+
+
+def test_structured_insights(fake_backend):
+    result = analyzer.get_resume_insights(RESUME)
+    assert result == insights.empty(insights.ResumeInsights)
+
+
+def test_run_full_report(fake_backend):
+    report = analyzer.run_full_report(RESUME, JD)
+    assert report["errors"] == {}
+    assert report["ats_score"] > 0 and "python" in report["matched_keywords"]
+    for name in ("analysis", "section_suggestions", "jd_comparison", "rewritten_resume", "tailored_resume"):
+        assert report[name] is not None
+
+
+def test_run_full_report_runs_calls_concurrently(fake_backend):
+    fake_backend.latency = 0.3
+    report = analyzer.run_full_report(RESUME, JD)
+    assert report["errors"] == {}
+    # Four calls of 0.3s each on a pool of at least four: about 0.3s, not 1.2s
+    assert report["elapsed"] < 0.9
+
+
+def test_run_full_report_collects_failures(fake_backend):
+    fake_backend.error_rate = 1.0
+    report = analyzer.run_full_report(RESUME, JD)
+    assert set(report["errors"]) == {"insights", "job_match", "rewritten_resume", "tailored_resume"}
+    assert report["insights"] is None and report["analysis"] is None
+    assert report["ats_score"] > 0  # local results survive the outage
+
+
+def test_run_full_report_times_out(fake_backend):
+    fake_backend.latency = 0.5
+    report = analyzer.run_full_report(RESUME, timeout=0.05)
+    assert report["errors"]["insights"].startswith("Timed out")
+
+
+def test_ai_calls_run_on_the_bounded_pool(fake_backend):
+    threads = []
+
+    def record(*args):
+        threads.append(threading.current_thread().name)
+        yield from args
+
+    assert analyzer.run_ai_call(lambda: threading.current_thread().name).startswith("gemini")
+    assert list(analyzer.stream_ai_call(record, "a", "b")) == ["a", "b"]
+    assert threads[0].startswith("gemini")
+
+
+def test_stream_ai_call_raises_stream_errors():
+    def failing():
+        yield "partial"
+        raise ValueError("stream broke")
+
+    with pytest.raises(ValueError):
+        list(analyzer.stream_ai_call(failing))
+
+
+def test_stream_ai_call_raises_when_the_stream_cannot_start():
+    def failing():
+        raise ValueError("no stream")
+
+    errors = []
+
+    def consume():
+        try:
+            list(analyzer.stream_ai_call(failing))
+        except ValueError as e:
+            errors.append(e)
+
+    # On a thread, so a consumer left waiting fails the test instead of hanging it
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    consumer.join(5)
+    assert [str(e) for e in errors] == ["no stream"]
+
+
+def test_prompts_keep_repeated_lines(fake_backend, monkeypatch):
+    prompts = []
+    monkeypatch.setattr(analyzer, "_generate", lambda prompt, name: prompts.append(prompt) or "")
+    resume = RESUME + "\nSoftware Engineer, Beta Inc\n- Built Python services on AWS\n" * 2
+    analyzer.analyze_with_ai(resume)
+    assert prompts[0].count("- Built Python services on AWS") == 3
+
+
+def test_rewrites_are_not_trimmed_to_the_budget(fake_backend, monkeypatch):
+    prompts = []
+    monkeypatch.setattr(analyzer, "_generate", lambda prompt, name: prompts.append(prompt) or "")
+    monkeypatch.setattr(analyzer, "PROMPT_TOKEN_BUDGET", 40)
+    analyzer.analyze_with_ai(RESUME)
+    analyzer.rewrite_resume_with_ai(RESUME)
+    assert "- Built Python services on AWS" not in prompts[0]
+    assert "- Built Python services on AWS" in prompts[1]
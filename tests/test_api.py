@@ -0,0 +1,104 @@
+import io
+import json
+
+import pytest
+from flask import request
+
+import analyzer
+import api
+from conftest import RESUME
+
+
+@pytest.fixture
+def http(fake_backend):
+    return api.create_app().test_client()
+
+
+def upload(content, filename="resume.txt"):
+    return io.BytesIO(content.encode("utf-8")), filename
+
+
+def test_health(http):
+    assert http.get("/health").get_json() == {"status": "ok"}
+
+
+def test_parse_upload(http):
+    response = http.post("/parse", data={"resume": upload(RESUME)}, content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert response.get_json()["text"].startswith("Jane Doe")
+
+
+def test_analyze_text(http):
+    response = http.post("/analyze", json={"resume_text": RESUME})
+    assert response.status_code == 200
+    assert response.get_json()["analysis"]
+
+
+def test_analyze_reports_backend_errors(http, fake_backend):
+    fake_backend.error_rate = 1.0
+    response = http.post("/analyze", json={"resume_text": RESUME})
+    assert response.status_code == 502
+    assert "simulated outage" in response.get_json()["error"]
+
+
+def test_analyze_answer_starting_with_error(http):
+    import backends
+    import client
+
+    client.set_backend(backends.StubBackend("Error handling is a strength of this resume."))
+    response = http.post("/analyze", json={"resume_text": RESUME})
+    assert response.status_code == 200
+    assert response.get_json()["analysis"].startswith("Error handling")
+
+
+def test_analyze_stream(http):
+    response = http.post("/analyze?stream=1", data={"resume": upload(RESUME)}, content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert response.get_data(as_text=True)
+
+
+def test_json_body_must_be_an_object(http):
+    response = http.post("/analyze", json=["not", "an", "object"])
+    assert response.status_code == 400
+
+
+def test_batch_ats_score(http):
+    items = [{"resume_text": RESUME}, {"resume_text": "Skills\nPython"}]
+    response = http.post("/batch/ats-score", json={"items": items})
+    results = response.get_json()["results"]
+    assert [result["index"] for result in results] == [0, 1]
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_batch_rejects_non_object_items(http):
+    response = http.post("/batch/analyze", json={"items": [{"resume_text": RESUME}, "text"]})
+    assert response.status_code == 400
+    assert "items[1]" in response.get_json()["error"]
+
+
+def test_batch_rejects_non_string_fields(http):
+    response = http.post("/batch/ats-score", json={"items": [{"resume_text": 42}]})
+    assert response.get_json()["results"][0]["status"] == 400
+
+
+def test_streamed_multipart_ai_batch_reads_uploads_in_the_request(http, monkeypatch):
+    # Werkzeug may close the request's files before a pool thread reaches an item
+    def submit_after_close(func, *args):
+        for _, upload in request.files.items(multi=True):
+            upload.close()
+        return analyzer.submit_ai_call(func, *args)
+
+    monkeypatch.setattr(api, "submit_ai_call", submit_after_close)
+    resumes = [upload(RESUME, "a.txt"), upload("Skills\nPython", "b.txt")]
+    response = http.post("/batch/analyze?stream=1", data={"resume": resumes}, content_type="multipart/form-data")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.status_code == 200
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["status"] == 200 for line in lines)
+
+
+def test_batch_compare_parses_the_shared_jd_once(http):
+    data = {"resume": [upload(RESUME, "a.txt"), upload("Skills\nSQL", "b.txt")],
+            "jd": upload("Python developer with SQL", "jd.txt")}
+    response = http.post("/batch/compare", data=data, content_type="multipart/form-data")
+    assert [result["status"] for result in response.get_json()["results"]] == [200, 200]
@@ -0,0 +1,58 @@
+import os
+import threading
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import client
+from backends import StubBackend
+from conftest import RESUME
+from tasks import CANCELLED, task_queue
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+class BlockingBackend(StubBackend):
+    """Answers only once released, so the AI tasks are still running when cancelled."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def generate(self, *args, **kwargs):
+        self.release.wait()
+        return super().generate(*args, **kwargs)
+
+
+@pytest.fixture
+def app():
+    backend = BlockingBackend()
+    client.set_backend(backend)
+    app = AppTest.from_file(APP, default_timeout=30).run()
+    app.get("file_uploader")[0].upload("resume.txt", RESUME.encode("utf-8"), "text/plain").run()
+    yield app
+    backend.release.set()
+    client.set_backend(None)
+
+
+def states(app):
+    return {slot: task_queue.status(task_id)["state"] for slot, task_id in app.session_state["tasks"].items()}
+
+
+def test_cancelled_task_stays_cancelled_across_reruns(app):
+    cancel = next(button for button in app.button if button.key == "cancel:resume:insights")
+    cancel.click().run()
+    tasks = dict(app.session_state["tasks"])
+    app.run()
+    app.run()
+    assert dict(app.session_state["tasks"]) == tasks
+    assert states(app)["resume:insights"] == CANCELLED
+    assert "Cancelled." in [info.value for info in app.info]
+
+
+def test_retry_runs_the_task_again(app):
+    next(button for button in app.button if button.key == "cancel:resume:insights").click().run()
+    cancelled = app.session_state["tasks"]["resume:insights"]
+    next(button for button in app.button if button.key == "retry:resume:insights").click().run()
+    assert app.session_state["tasks"]["resume:insights"] != cancelled
+    assert states(app)["resume:insights"] != CANCELLED
@@ -0,0 +1,88 @@
+import random
+import re
+
+from analyzer import get_ats_breakdown, get_ats_score
+from ats_rules import RuleSet
+
+VOCABULARY = ["Python", "python", "SQL", "Java", "JavaScript", "Node.js", "ML", "NLP", "AWS", "docker",
+              "Kubernetes", "Excel", "React", "skills", "Technical Skills", "experience", "work history",
+              "Education", "qualifications", "projects", "email:", "Phone", "linkedin.com/in/jane",
+              "team", "built", "services", "led", "data", "pipeline", "customers", "-", "2021",
+              "python_dev", "Machine learning", "Pandas"]
+
+
+def legacy_ats_score(resume_text):
+    """get_ats_score before the rule engine, to check the default config against."""
+    score = 0
+    feedback = []
+    required_sections = {
+        "Skills": r"skills?|technical skills?",
+        "Experience": r"experience|employment|work history",
+        "Education": r"education|qualifications",
+        "Projects": r"projects|project experience",
+        "Contact": r"(email|phone|linkedin|contact)"
+    }
+    for section, pattern in required_sections.items():
+        if re.search(pattern, resume_text, re.IGNORECASE):
+            score += 15
+        else:
+            feedback.append(f"❌ Missing or unclear: **{section}**")
+    keyword_count = len(re.findall(r"\b(Java|Python|SQL|ML|NLP|React|Node|Excel|AWS|Docker|Kubernetes)\b",
+                                   resume_text, re.IGNORECASE))
+    if keyword_count >= 5:
+        score += 25
+    elif keyword_count >= 3:
+        score += 15
+    else:
+        feedback.append("❌ Not enough technical keywords.")
+    word_count = len(resume_text.split())
+    if word_count < 300:
+        score -= 5
+    elif word_count > 1000:
+        score -= 5
+    return min(score, 100), feedback
+
+
+def text(seed):
+    rng = random.Random(seed)
+    words = rng.choice([5, 40, 299, 300, 1000, 1001, rng.randint(1, 1200)])
+    # Sparse vocabularies too, so sections and keywords are sometimes missing
+    vocabulary = rng.sample(VOCABULARY, rng.randint(1, len(VOCABULARY)))
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def rules_by_name(result):
+    return {rule["rule"]: rule for rule in result["rules"]}
+
+
+def test_default_rules_match_the_previous_scoring():
+    for seed in range(500):
+        resume = text(seed)
+        assert get_ats_score(resume) == legacy_ats_score(resume), resume
+
+
+def test_breakdown():
+    result = get_ats_breakdown("Skills: Python, SQL, AWS. Experience at Acme. Email me.")
+    rules = rules_by_name(result)
+    assert not rules["Education"]["passed"] and rules["Skills"]["points"] == 15
+    assert rules["Keywords"]["matched"] == {"Python": 1, "SQL": 1, "AWS": 1}
+    assert rules["Keywords"]["points"] == 15
+    assert rules["Under 300 words"]["points"] == -5
+    assert result["score"] == sum(rule["points"] for rule in result["rules"])
+
+
+def test_role_adds_its_keyword_family():
+    resume = "Skills: Pandas, NumPy, machine learning, Python"
+    assert rules_by_name(get_ats_breakdown(resume))["Keywords"]["weighted_count"] == 1
+    keywords = rules_by_name(get_ats_breakdown(resume, role="data"))["Keywords"]
+    assert keywords["families"] == ["general", "data"]
+    assert keywords["weighted_count"] == 4.5  # machine learning weighs 1.5
+
+
+def test_rules_from_config():
+    rules = RuleSet({
+        "sections": [{"name": "Skills", "pattern": "skills", "points": 40}],
+        "keywords": {"thresholds": [{"min": 2, "points": 60}], "families": {"general": {"Go": 1, "Rust": 1}}},
+    })
+    assert rules.evaluate("Skills: Go and Rust")["score"] == 100
+    assert rules.evaluate("Go")["feedback"] == ["❌ Missing or unclear: **Skills**"]
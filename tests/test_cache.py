@@ -0,0 +1,106 @@
+import sqlite3
+import time
+
+import pytest
+
+import cache
+from cache import TieredCache
+
+
+@pytest.fixture
+def enabled_cache(tmp_path, monkeypatch):
+    """The response cache, switched on and backed by a temporary database."""
+    response_cache = TieredCache("responses", cache_dir=str(tmp_path))
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(cache, "response_cache", response_cache)
+    return response_cache
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    store = TieredCache("lru", cache_dir=None, max_memory_entries=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert (store.get("a"), store.get("b"), store.get("c")) == (1, None, 3)
+    assert store.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_restart_and_evicts_oldest_accessed(tmp_path):
+    store = TieredCache("disk", cache_dir=str(tmp_path), max_disk_entries=2)
+    store.set("a", {"text": "A"})
+    time.sleep(0.01)
+    store.set("b", {"text": "B"})
+    time.sleep(0.01)
+    store.set("c", {"text": "C"})
+    reopened = TieredCache("disk", cache_dir=str(tmp_path))
+    assert reopened.get("a") is None
+    assert reopened.get("c") == {"text": "C"}
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    store = TieredCache("ttl", cache_dir=str(tmp_path), ttl=0.05)
+    store.set("a", "value")
+    assert store.get("a") == "value"
+    time.sleep(0.1)
+    assert store.get("a") is None
+    assert TieredCache("ttl", cache_dir=str(tmp_path), ttl=0.05).get("a") is None
+
+
+def test_locked_database_does_not_fail_a_hit(tmp_path):
+    TieredCache("locked", cache_dir=str(tmp_path)).set("a", "value")
+    store = TieredCache("locked", cache_dir=str(tmp_path))  # empty memory tier
+    other = sqlite3.connect(str(tmp_path / "locked.sqlite3"))
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        start = time.perf_counter()
+        assert store.get("a") == "value"  # the access-time update is skipped
+        store.set("b", "other")  # kept in memory only
+        assert store.get("b") == "other"
+        assert time.perf_counter() - start < 3
+    finally:
+        other.rollback()
+    assert store.stats()["disk_errors"] == 2
+
+
+def test_cached_generate_reuses_answers(enabled_cache):
+    calls = []
+    generate = lambda: calls.append(1) or "answer"
+    assert cache.cached_generate("f", "a  prompt", "model", generate) == "answer"
+    assert cache.cached_generate("f", "a prompt\n", "model", generate) == "answer"  # same prompt up to whitespace
+    assert len(calls) == 1
+
+
+def test_failures_are_not_cached(enabled_cache):
+    def fail():
+        raise RuntimeError("outage")
+
+    with pytest.raises(RuntimeError):
+        cache.cached_generate("f", "prompt", "model", fail)
+    assert cache.cached_generate("f", "prompt", "model", lambda: "answer") == "answer"
+
+
+def test_interrupted_streams_are_not_cached(enabled_cache):
+    stream = cache.cached_stream("f", "prompt", "model", lambda: iter(["a", "b"]))
+    next(stream)
+    stream.close()
+    assert list(cache.cached_stream("f", "prompt", "model", lambda: iter(["c"]))) == ["c"]
+    assert list(cache.cached_stream("f", "prompt", "model", lambda: iter(["d"]))) == ["c"]
+
+
+def test_analyzer_error_strings_are_not_cached(enabled_cache, fake_backend):
+    import analyzer
+
+    fake_backend.error_rate = 1.0
+    assert analyzer.analyze_with_ai("Skills\nPython").startswith("Error during AI analysis:")
+    fake_backend.error_rate = 0.0
+    assert analyzer.analyze_with_ai("Skills\nPython").startswith("lorem")
+
+
+def test_disabled_cache_always_generates(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_ENABLED", False)
+    calls = []
+    for _ in range(2):
+        cache.cached_generate("f", "prompt", "model", lambda: calls.append(1) or "answer")
+    assert len(calls) == 2
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+import job_store
+
+JOBS = [
+    {"title": "Data Engineer", "company": "Acme", "location": "Berlin, Germany",
+     "link": "https://example.com/jobs/1?trk=search", "description": "Build Spark pipelines."},
+    {"title": "Frontend Developer", "company": "Globex", "location": "Remote",
+     "link": "https://example.com/jobs/2", "description": "React and TypeScript; some data engineering."},
+    {"title": "Senior Data Engineers", "company": "Initech", "location": "Munich, Germany",
+     "link": "https://example.com/jobs/3/", "description": "Airflow and SQL."},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return job_store.JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def titles(jobs):
+    return [job["title"] for job in jobs]
+
+
+def test_ingest_upserts_by_link(store):
+    assert store.ingest(JOBS, now=100) == 3
+    updated = dict(JOBS[0], link="https://example.com/jobs/1?trk=other", title="Lead Data Engineer")
+    store.ingest([updated, {"title": "No link"}], now=200)
+    assert store.stats() == {"jobs": 3, "queries": 0}
+    first_seen, last_seen = store._db.execute(
+        "SELECT first_seen, last_seen FROM jobs WHERE link = ?", ("https://example.com/jobs/1",)
+    ).fetchone()
+    assert (first_seen, last_seen) == (100, 200)
+    # The full-text index follows the update
+    assert titles(store.search("lead")) == ["Lead Data Engineer"]
+
+
+def test_search_ranks_title_matches_first(store):
+    store.ingest(JOBS)
+    assert titles(store.search("data engineer")) == ["Data Engineer", "Senior Data Engineers",
+                                                     "Frontend Developer"]
+    assert titles(store.search("engineer", location="germany")) == ["Data Engineer", "Senior Data Engineers"]
+    assert titles(store.search("devel")) == ["Frontend Developer"]  # prefix match
+    assert store.search("") == [] and store.search("cobol") == []
+
+
+def test_query_freshness(store):
+    store.ingest(JOBS, query="Data Engineers", location="Germany", now=100)
+    assert store.fetched_at("engineer data", "germany") == 100
+    assert store.fetched_at("Data Engineers") is None
+
+
+def test_iter_jobs_answers_fresh_queries_from_the_index(store, monkeypatch):
+    store.ingest(JOBS, query="data engineer")
+    monkeypatch.setattr(job_store, "refresh", lambda *args, **kwargs: pytest.fail("scraped a fresh query"))
+    assert len(list(job_store.iter_jobs("data engineer", store=store))) == 3
+
+
+def test_iter_jobs_refreshes_stale_queries_in_the_background(store, monkeypatch):
+    store.ingest(JOBS, query="data engineer", now=time.time() - 3600)
+    refreshed = threading.Event()
+    monkeypatch.setattr(job_store, "refresh", lambda *args: refreshed.set())
+    assert len(list(job_store.iter_jobs("data engineer", max_age=60, store=store))) == 3
+    assert refreshed.wait(5)
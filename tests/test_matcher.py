@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from analyzer import highlight_resume_vs_jd, match_resume_vs_jd
+from benchmark import legacy_highlight_resume_vs_jd
+from matcher import HIGHLIGHT_TEMPLATE, KeywordMatcher, extract_jd_terms, stem
+
+# No words that occur in the highlight markup, which the regex version would rescan
+VOCABULARY = ["python", "pythons", "data", "pipeline", "pipelines", "engineer", "engineering", "sql",
+              "cloud", "team", "build", "built", "building", "services", "api", "aws", "with", "and"]
+
+
+def text(words, seed):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) + rng.choice(["", "", ",", ".", "\n"]) for _ in range(words))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_unstemmed_words_match_the_regex_highlighting(seed):
+    resume, jd = text(120, seed), text(80, seed + 100)
+    terms = extract_jd_terms(jd, phrases=False, use_stem=False)
+    html = KeywordMatcher(terms, use_stem=False).highlight(resume)
+    assert (html, terms) == legacy_highlight_resume_vs_jd(resume, jd)
+
+
+def test_word_forms_share_a_stem():
+    assert stem("pipelines") == stem("pipeline")
+    assert stem("engineering") == stem("engineer")
+    terms = extract_jd_terms("Build data pipelines. Own the pipeline.", phrases=False)
+    assert terms == ["pipelines"]
+    spans = KeywordMatcher(terms).find("Pipeline work, many pipelines")
+    assert [term for _, _, term in spans] == ["pipelines", "pipelines"]
+
+
+def test_phrases_match_leftmost_longest():
+    matcher = KeywordMatcher(["data", "data pipelines", "pipelines"])
+    result = matcher.match("Built data pipelines and data tools")
+    assert [span["text"] for span in result["spans"]] == ["data pipelines", "data"]
+    # A phrase match also counts for the single-word terms inside it
+    assert result["counts"] == {"data": 2, "data pipelines": 1, "pipelines": 1}
+
+
+def test_markup_is_not_rescanned():
+    html, _ = highlight_resume_vs_jd("Color and background work", "color color background background")
+    assert html == HIGHLIGHT_TEMPLATE.format("Color") + " and " + HIGHLIGHT_TEMPLATE.format("background") + " work"
+
+
+def test_match_resume_vs_jd_offsets():
+    result = match_resume_vs_jd("Python and SQL on AWS", "python sql python sql")
+    assert result["terms"] == ["python"]  # "sql" is shorter than four letters
+    assert result["spans"] == [{"offset": 0, "end": 6, "term": "python", "text": "Python"}]
@@ -0,0 +1,69 @@
+import io
+import sqlite3
+
+import pytest
+
+import parser
+from cache import TieredCache
+
+
+class LockedConnection:
+    """A cache database that another process keeps locked."""
+
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    def commit(self):
+        raise sqlite3.OperationalError("database is locked")
+
+    def rollback(self):
+        pass
+
+
+def two_page_pdf():
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in (["Jane Doe", "Skills", "Python", "1"], ["Experience", "Acme", "2"]):
+        for i, line in enumerate(page):
+            pdf.drawString(40, 800 - 15 * i, line)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def parse_cache(tmp_path, monkeypatch):
+    parse_cache = TieredCache("parses", cache_dir=str(tmp_path))
+    monkeypatch.setattr(parser, "CACHE_ENABLED", True)
+    monkeypatch.setattr(parser, "parse_cache", parse_cache)
+    return parse_cache
+
+
+def test_parse_text_upload(parse_cache):
+    document = parser.parse_document(b"Skills\r\nPython  \n\n\n\nSQL", filename="resume.txt")
+    assert document["text"] == "Skills\nPython\n\nSQL"
+    assert not document["cached"]
+    assert parser.parse_document(b"Skills\r\nPython  \n\n\n\nSQL", filename="resume.txt")["cached"]
+
+
+def test_locked_parse_cache_is_skipped(parse_cache):
+    parse_cache._db = LockedConnection()
+    assert parser.parse_resume(b"Skills\nPython", filename="resume.txt") == "Skills\nPython"
+    assert parse_cache.stats()["disk_errors"] >= 2
+
+
+def test_unsupported_format():
+    assert parser.parse_resume(b"data", filename="resume.xyz") == "Unsupported file format."
+
+
+def test_page_breaks_are_kept_only_on_request(parse_cache):
+    content = two_page_pdf()
+    document = parser.parse_document(content, filename="resume.pdf")
+    assert document["pages"] == 2
+    assert document["text"] == "Jane Doe\nSkills\nPython\n1\n\nExperience\nAcme\n2"
+    # The cached result keeps the breaks for callers that preprocess the text
+    text = parser.parse_resume(content, filename="resume.pdf", page_breaks=True)
+    assert f"\n{parser.PAGE_BREAK}\n" in text
+    assert parser.without_page_breaks(text) == document["text"]
@@ -0,0 +1,80 @@
+import pytest
+
+import client
+from parser import PAGE_BREAK
+from preprocess import TRUNCATION_MARKER, clean_text, compact, render_sections, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+PROFESSIONAL EXPERIENCE:
+Acme Corp, Support Lead
+- Improved customer experience scores by 20%
+- Ran skills workshops for new hires
+* Education outreach programme
+Skills: Python, SQL
+
+## Education
+BSc Computer Science"""
+
+
+def test_headings_must_name_the_whole_line():
+    sections = split_sections(RESUME)
+    assert [(section["name"], section["heading"]) for section in sections] == [
+        ("Header", ""), ("Experience", "PROFESSIONAL EXPERIENCE:"), ("Skills", ""), ("Education", "## Education"),
+    ]
+    assert "- Ran skills workshops for new hires" in sections[1]["body"]
+    assert split_sections("Education and Training\nMSc")[0]["name"] == "Education"
+    assert split_sections("My education was funded by a scholarship")[0]["name"] == "Header"
+
+
+def test_sectioned_rendering_keeps_every_line():
+    text = render_sections(split_sections(RESUME), sectioned=True)
+    assert text.startswith("[Header]\nJane Doe")
+    assert "[Experience]\nPROFESSIONAL EXPERIENCE:\nAcme Corp" in text
+    assert "[Skills]\nSkills: Python, SQL" in text
+    for line in RESUME.split("\n"):
+        assert line in text
+
+
+def test_clean_text_keeps_bullets_and_repeated_lines():
+    text = clean_text("Lead\u00ad Engineer\n•  Built   services\n\n\n• Built services")
+    assert text == "Lead Engineer\n- Built services\n\n- Built services"
+
+
+def test_page_numbers_are_dropped_only_at_page_edges():
+    assert clean_text("Awards\n2019\nHackathon winner\n3") == "Awards\n2019\nHackathon winner\n3"
+    pages = ["Jane Doe\nAwards\n2019\nHackathon winner\nPage 1 of 2", "Page 2 of 2\nSkills\n42\nPython\n2"]
+    text = clean_text(f"\n{PAGE_BREAK}\n".join(pages))
+    assert text == "Jane Doe\nAwards\n2019\nHackathon winner\n\nSkills\n42\nPython"
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    calls = []
+
+    def count_tokens(text, model_name=client.DEFAULT_MODEL):
+        calls.append(text)
+        return client.estimate_tokens(text)
+
+    monkeypatch.setattr(client, "count_tokens", count_tokens)
+    return calls
+
+
+def test_compact_without_a_budget_does_not_count_tokens(counted):
+    result = compact(RESUME, 0)
+    assert counted == []
+    assert result["tokens"] == client.estimate_tokens(result["text"])
+
+
+def test_compact_counts_once_when_nothing_is_cut(counted):
+    result = compact(RESUME + "\n\n\n", 1000)
+    assert counted == [RESUME + "\n\n\n"]
+    assert result["text"] == render_sections(split_sections(clean_text(RESUME)))
+    assert 0 < result["tokens"] <= result["original_tokens"]
+
+
+def test_compact_trims_to_the_budget(counted):
+    result = compact(RESUME + "\n" + "- Shipped a feature\n" * 200, 100)
+    assert result["tokens"] <= 100
+    assert TRUNCATION_MARKER in result["text"] and "jane@example.com" in result["text"]
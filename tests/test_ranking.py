@@ -0,0 +1,65 @@
+import math
+from collections import Counter
+
+import pytest
+
+import ranking
+
+JOBS = [
+    {"title": "Frontend Developer", "company": "Globex", "description": "React, TypeScript, CSS."},
+    {"title": "Data Engineer", "company": "Acme", "description": "Python pipelines with SQL, Airflow."},
+    {"title": "Python Developer", "company": "Initech", "description": "Python services, SQL."},
+    {"title": "Accountant", "company": "Hooli", "description": "Ledgers, audits."},
+]
+# No words in common with the last two jobs (the index keeps stopwords such as "and")
+RESUME = "Data engineer. Python, SQL, Airflow pipelines on AWS."
+
+
+def reference_tfidf_scores(resume, jobs):
+    """The same TF-IDF cosine, computed with dicts."""
+    docs = [Counter(ranking._terms(ranking._index_text(job))) for job in jobs]
+    df = Counter(term for doc in docs for term in doc)
+    idf = {term: math.log((len(docs) + 1) / (count + 1)) + 1 for term, count in df.items()}
+    query = Counter(term for term in ranking._terms(resume) if term in idf)
+    q = {term: (1 + math.log(count)) * idf[term] for term, count in query.items()}
+    scores = []
+    for doc in docs:
+        d = {term: (1 + math.log(count)) * idf[term] for term, count in doc.items()}
+        dot = sum(weight * d.get(term, 0.0) for term, weight in q.items())
+        norm = math.sqrt(sum(w * w for w in d.values())) * math.sqrt(sum(w * w for w in q.values()))
+        scores.append(dot / norm if norm else 0.0)
+    return scores
+
+
+def test_tfidf_scores_match_the_reference():
+    assert ranking.JobIndex(JOBS).scores(RESUME) == pytest.approx(reference_tfidf_scores(RESUME, JOBS))
+
+
+@pytest.mark.parametrize("method", ["tfidf", "bm25"])
+def test_rank_orders_by_similarity(method):
+    ranked = ranking.rank_jobs(RESUME, JOBS, method=method)
+    assert [job["title"] for job in ranked] == ["Data Engineer", "Python Developer", "Frontend Developer",
+                                                 "Accountant"]
+    assert ranked[-1]["similarity"] == ranked[-2]["similarity"] == 0.0  # ties keep their order
+    assert [job["similarity"] for job in ranked] == sorted((job["similarity"] for job in ranked), reverse=True)
+
+
+def test_bm25_prefers_the_shorter_of_two_equal_matches():
+    padding = " ".join(f"word{i}" for i in range(60))
+    jobs = [{"title": "Engineer", "description": f"Kafka. {padding}"},
+            {"title": "Engineer", "description": "Kafka."}]
+    ranked = ranking.rank_jobs("Kafka", jobs, method="bm25")
+    assert ranked[0]["description"] == "Kafka."
+
+
+def test_rank_without_overlap():
+    index = ranking.JobIndex(JOBS)
+    assert not index.scores("Welding, carpentry").any()
+    assert [job["title"] for job in index.rank("Welding", top_n=2)] == ["Frontend Developer", "Data Engineer"]
+
+
+def test_compare_top_jobs_sends_only_the_top_k(fake_backend):
+    top = ranking.compare_top_jobs(RESUME, JOBS, top_k=2)
+    assert [job["title"] for job in top] == ["Data Engineer", "Python Developer"]
+    assert fake_backend.calls == 2
+    assert all(job["ai_comparison"] for job in top)
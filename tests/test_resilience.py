@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+import client
+import resilience
+
+
+@pytest.fixture
+def retrying(monkeypatch):
+    """Three attempts with no backoff and a fresh retry budget."""
+    monkeypatch.setattr(resilience, "MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(resilience, "MAX_BACKOFF", 0)
+    monkeypatch.setattr(resilience, "retry_budget", resilience.RetryBudget())
+
+
+def flaky(failures):
+    """A callable that raises a retryable 503 failures times, then answers."""
+    calls = []
+
+    def call():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise api_exceptions.ServiceUnavailable("down")
+        return "ok"
+
+    call.calls = calls
+    return call
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    bucket = resilience.TokenBucket(rate_per_minute=600, capacity=2)  # one token per 0.1s
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire(timeout=0)
+    start = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert 0.05 < time.monotonic() - start < 0.5
+    stats = bucket.stats()
+    assert stats["acquired"] == 3 and stats["queue_depth"] == 0 and stats["max_wait"] > 0.05
+
+
+def test_retry_budget_caps_retries():
+    budget = resilience.RetryBudget(ratio=0.5, max_tokens=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    assert budget.exhausted == 1
+    budget.record_success()
+    budget.record_success()
+    assert budget.try_spend()
+
+
+def test_retryable_errors_are_retried(retrying):
+    call = flaky(2)
+    assert resilience.call_with_resilience(call) == "ok"
+    assert len(call.calls) == 3
+
+
+def test_retries_stop_at_max_attempts(retrying):
+    call = flaky(5)
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        resilience.call_with_resilience(call)
+    assert len(call.calls) == 3
+
+
+def test_retries_stop_when_the_budget_is_spent(retrying, monkeypatch):
+    monkeypatch.setattr(resilience, "retry_budget", resilience.RetryBudget(max_tokens=1))
+    call = flaky(5)
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        resilience.call_with_resilience(call)
+    assert len(call.calls) == 2
+    assert resilience.retry_budget.exhausted == 1
+
+
+def test_other_errors_are_not_retried(retrying):
+    calls = []
+
+    def call():
+        calls.append(None)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        resilience.call_with_resilience(call)
+    assert len(calls) == 1
+
+
+def test_concurrent_identical_requests_share_one_backend_call(fake_backend, monkeypatch):
+    coalesced = resilience.stats()["coalesced"]
+    generate = fake_backend.generate
+
+    def generate_once_all_joined(*args):
+        # Hold the leader's call until the other seven callers are waiting on it
+        deadline = time.monotonic() + 5
+        while resilience.stats()["coalesced"] < coalesced + 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return generate(*args)
+
+    monkeypatch.setattr(fake_backend, "generate", generate_once_all_joined)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: client.generate_text("Same prompt"), range(8)))
+    assert fake_backend.calls == 1
+    assert len(set(results)) == 1
+    assert resilience.stats()["coalesced"] == coalesced + 7
@@ -0,0 +1,63 @@
+import pytest
+
+import revisions
+from conftest import RESUME
+
+REVISED = RESUME.replace("- Built Python services on AWS", "- Built Python services on AWS serving 2M users")
+
+
+@pytest.fixture
+def requested(monkeypatch):
+    """Section names sent to get_section_suggestions, which answers with one suggestion."""
+    names = []
+
+    def get_section_suggestions(name, text):
+        names.append(name)
+        return [f"Improve {name}"]
+
+    monkeypatch.setattr(revisions, "get_section_suggestions", get_section_suggestions)
+    return names
+
+
+def test_diff_sections_marks_only_the_edited_section():
+    changes = revisions.diff_sections(revisions.sections(RESUME), revisions.sections(REVISED))
+    statuses = {change["key"]: change["status"] for change in changes}
+    assert statuses["Experience"] == revisions.CHANGED
+    assert {status for key, status in statuses.items() if key != "Experience"} == {revisions.UNCHANGED}
+    assert "+- Built Python services on AWS serving 2M users" in changes[1]["diff"]
+
+
+def test_heading_edits_change_the_fingerprint():
+    resume = "Jane Doe\n\nExperience\nSupport Lead, Acme\n- Ran skills workshops\n\nEducation\nBSc"
+    edits = [("- Ran skills workshops", "- Ran weekly skills workshops"), ("Experience", "Professional Experience")]
+    for before, after in edits:
+        changes = revisions.diff_sections(revisions.sections(resume), revisions.sections(resume.replace(before, after)))
+        assert [change["status"] for change in changes] == [revisions.UNCHANGED, revisions.CHANGED,
+                                                            revisions.UNCHANGED]
+        assert f"-{before}\n+{after}" in changes[1]["diff"]
+
+
+def test_suggest_sections_reuses_known_and_requests_the_rest(requested):
+    previous = revisions.sections(RESUME)
+    known = {section["fingerprint"]: ["Earlier suggestion"] for section in previous if section["name"] == "Skills"}
+    result = revisions.suggest_sections(revisions.sections(REVISED), known)
+    assert result["reused"] == ["Skills"]
+    # Unchanged sections without earlier suggestions are requested along with the edited one
+    assert sorted(requested) == sorted(result["requested"]) == ["Education", "Experience", "Header"]
+    assert len(result["suggestions"]) == 4
+
+
+def test_suggest_sections_reports_errors_per_section(monkeypatch):
+    monkeypatch.setattr(revisions, "get_section_suggestions", lambda name, text: "Error generating suggestions")
+    result = revisions.suggest_sections(revisions.sections("Skills\nPython"), {})
+    assert result["errors"] == {"Skills": "Error generating suggestions"}
+    assert result["suggestions"] == {}
+
+
+def test_seed_suggestions_matches_sections_by_name():
+    version = revisions.version(RESUME)
+    revisions.seed_suggestions(version, {"section_suggestions": [
+        {"section": "skills", "suggestions": ["Group by category"]},
+        {"section": "Work History", "suggestions": ["Add metrics"]},
+    ]})
+    assert list(version["suggestions"].values()) == [["Group by category"]]
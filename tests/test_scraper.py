@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from scraper import DriverPool, scrape_linkedin_jobs
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool():
+    created = []
+
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+
+    pool = DriverPool(size=2, factory=factory)
+    pool.created = created
+    yield pool
+    pool.close()
+
+
+def test_pool_reuses_warm_drivers(pool):
+    with pool.driver() as first:
+        pass
+    with pool.driver() as second:
+        pass
+    assert first is second and len(pool.created) == 1
+
+
+def test_pool_creates_up_to_size(pool):
+    with pool.driver() as first, pool.driver() as second:
+        assert first is not second
+    assert len(pool.created) == 2
+
+
+def test_pool_discards_broken_drivers(pool):
+    with pytest.raises(WebDriverException):
+        with pool.driver() as broken:
+            raise WebDriverException("tab crashed")
+    assert broken.quit_called
+    with pool.driver() as replacement:
+        assert replacement is not broken
+
+
+def test_warm_up_stops_at_size(pool):
+    pool.warm_up(count=5)
+    assert len(pool.created) == 2
+
+
+@pytest.mark.skipif(not (os.getenv("CHROMEDRIVER_PATH") or shutil.which("chromedriver")),
+                    reason="needs Chrome and chromedriver")
+def test_scrape_saved_fixture():
+    from benchmark import serve_fixtures
+
+    pool = DriverPool(size=1)
+    try:
+        with serve_fixtures() as base:
+            jobs = scrape_linkedin_jobs("Data Engineer", max_results=40, base_url=f"{base}/linkedin_jobs.html",
+                                        pool=pool)
+    finally:
+        pool.close()
+    assert len(jobs) == 40  # past the first page of 25, so scrolling loads more
+    assert len({job["link"] for job in jobs}) == 40
+    assert all(job["title"] and job["company"] for job in jobs)
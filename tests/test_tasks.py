@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from tasks import CANCELLED, DONE, FAILED, PENDING, RUNNING, TIMED_OUT, TaskQueue
+
+
+@pytest.fixture
+def task_queue():
+    task_queue = TaskQueue(workers=2, timeout=5, retention=60)
+    yield task_queue
+    task_queue.shutdown()
+
+
+def test_result(task_queue):
+    task_id = task_queue.submit(sum, [1, 2, 3])
+    status = task_queue.result(task_id, timeout=2)
+    assert status["state"] == DONE and status["result"] == 6
+
+
+def test_failure(task_queue):
+    status = task_queue.result(task_queue.submit(int, "not a number"), timeout=2)
+    assert status["state"] == FAILED and "invalid literal" in status["error"]
+
+
+def test_same_key_is_deduplicated(task_queue):
+    release = threading.Event()
+    first = task_queue.submit(release.wait, 2, key="k")
+    assert task_queue.submit(release.wait, 2, key="k") == first
+    release.set()
+    assert task_queue.result(first, timeout=2)["state"] == DONE
+    assert task_queue.submit(release.wait, 2, key="k") == first  # done results are reused
+    assert task_queue.metrics()["deduplicated"] == 2
+
+
+def test_cancel_stops_an_iterator_between_items(task_queue):
+    def items():
+        for i in range(100):
+            time.sleep(0.02)
+            yield i
+
+    task_id = task_queue.submit(items, iterate=True)
+    while len(task_queue.status(task_id)["partial"]) < 2:
+        time.sleep(0.01)
+    assert task_queue.cancel(task_id)
+    status = task_queue.status(task_id)
+    assert status["state"] == CANCELLED
+    time.sleep(0.1)
+    assert len(task_queue.status(task_id)["partial"]) < 100
+    assert not task_queue.cancel(task_id)  # already finished
+
+
+def test_cancel_while_queued(task_queue):
+    release = threading.Event()
+    busy = [task_queue.submit(release.wait, 2) for _ in range(2)]
+    queued = task_queue.submit(sum, [1])
+    assert task_queue.status(queued)["state"] == PENDING
+    assert task_queue.cancel(queued)
+    release.set()
+    for task_id in busy:
+        task_queue.result(task_id, timeout=2)
+    assert task_queue.status(queued)["state"] == CANCELLED
+
+
+def test_timeout(task_queue):
+    task_id = task_queue.submit(time.sleep, 0.5, timeout=0.1)
+    assert task_queue.status(task_id)["state"] in (PENDING, RUNNING)
+    status = task_queue.result(task_id, timeout=2)
+    assert status["state"] == TIMED_OUT
+    time.sleep(0.5)
+    assert task_queue.status(task_id)["state"] == TIMED_OUT  # the late result is discarded
+
+
+def test_metrics(task_queue):
+    task_queue.result(task_queue.submit(sum, [1]), timeout=2)
+    task_queue.result(task_queue.submit(int, "x"), timeout=2)
+    metrics = task_queue.metrics()
+    assert (metrics["submitted"], metrics[DONE], metrics[FAILED]) == (2, 1, 1)
+    assert metrics["pending"] == metrics["running"] == 0 and metrics["retained"] == 2
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+import telemetry
+
+
+@pytest.fixture
+def recording():
+    telemetry.reset()
+    telemetry.enable()
+    yield
+    telemetry.disable()
+    telemetry.reset()
+
+
+def test_nested_spans_share_a_trace(recording):
+    with telemetry.span("outer") as outer:
+        with telemetry.span("inner", pages=2) as inner:
+            pass
+    assert inner.parent is outer and inner.trace == outer.trace
+    text = telemetry.prometheus_text()
+    assert 'resumepro_span_seconds_count{outcome="ok",span="inner"} 1' in text
+    assert 'resumepro_span_size_total{span="inner",unit="pages"} 2' in text
+
+
+def test_stream_closed_on_another_thread(recording):
+    def stream():
+        with telemetry.span("ai_stream"):
+            yield "chunk"
+            yield "chunk"
+
+    chunks = stream()
+    next(chunks)
+    errors = []
+
+    def close():
+        try:
+            chunks.close()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=close)
+    thread.start()
+    thread.join()
+    assert errors == []
+    assert 'resumepro_span_seconds_count{outcome="cancelled",span="ai_stream"} 1' in telemetry.prometheus_text()
+
+
+def test_disabled_spans_record_nothing():
+    telemetry.reset()
+    with telemetry.span("parse") as span:
+        span.set(pages=1)
+    assert telemetry.prometheus_text() == "\n"
@@ -1,73 +1,141 @@
 from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+from bisect import bisect_right
 from datetime import datetime
-from fpdf import FPDF
+from functools import lru_cache
 from io import BytesIO
+from itertools import accumulate
 
+import telemetry
 
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 40
+TOP = PAGE_HEIGHT - 50
+BOTTOM = 50  # body text stops here; the footer sits below
 
+TITLE_FONT = ("Helvetica-Bold", 16)
+HEADING_FONT = ("Helvetica-Bold", 13)
+BODY_FONT = ("Helvetica", 12)
+FOOTER_FONT = ("Helvetica-Oblique", 9)
+LEADING = 16
+REPORT_TITLE = "AI Resume Analysis Report"
 
-def generate_pdf(analysis_text, file_name="resume_analysis.pdf"):
-    c = canvas.Canvas(file_name, pagesize=letter)
-    width, height = letter
-
-    # Title
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(40, height - 50, "📄 AI Resume Analysis Report")
-
-    # Add some space
-    c.setFont("Helvetica", 12)
-    text_object = c.beginText(40, height - 80)
-    text_object.setLeading(16)  # Line spacing
-
-    # Split the analysis into lines and wrap long lines
-    lines = analysis_text.splitlines()
-    max_width = width - 80  # right margin
-
-    for line in lines:
-        while line:
-            if c.stringWidth(line, "Helvetica", 12) < max_width:
-                text_object.textLine(line)
-                break
-            else:
-                # Wrap the line manually
-                cutoff = len(line)
-                while c.stringWidth(line[:cutoff], "Helvetica", 12) > max_width:
-                    cutoff -= 1
-                split_point = line.rfind(" ", 0, cutoff)
-                if split_point == -1:
-                    split_point = cutoff
-                text_object.textLine(line[:split_point])
-                line = line[split_point:].lstrip()
-
-        # Move to next page if needed
-        if text_object.getY() < 50:
-            c.drawText(text_object)
-            c.showPage()
-            text_object = c.beginText(40, height - 50)
-            text_object.setLeading(16)
-            c.setFont("Helvetica", 12)
-
-    c.drawText(text_object)
-    c.showPage()
+
+@lru_cache(maxsize=4096)
+def _glyph_width(char, font_name, font_size):
+    return stringWidth(char, font_name, font_size)
+
+
+def _printable(text):
+    # The standard PDF fonts only cover cp1252; drop what they cannot draw (e.g. emoji)
+    return text.encode("cp1252", "ignore").decode("cp1252")
+
+
+def wrap_line(line, max_width, font_name, font_size):
+    """Split one line into pieces no wider than max_width, breaking at spaces when possible.
+
+    Glyph widths are summed once into a running total, and each break point is found
+    by binary search on it, so a line costs O(n log n) instead of one stringWidth
+    call per candidate length.
+    """
+    if not line:
+        return [""]
+    offsets = [0.0] + list(accumulate(_glyph_width(char, font_name, font_size) for char in line))
+    pieces = []
+    start = 0
+    while start < len(line):
+        # Longest prefix from start that fits
+        end = bisect_right(offsets, offsets[start] + max_width) - 1
+        if end >= len(line):
+            pieces.append(line[start:])
+            break
+        end = max(end, start + 1)  # always make progress, even if one glyph is too wide
+        space = line.rfind(" ", start, end + 1)
+        if space > start:
+            end = space
+        pieces.append(line[start:end].rstrip())
+        start = end
+        while start < len(line) and line[start] == " ":
+            start += 1
+    return pieces
+
+
+def _layout(title, text):
+    """Lay the report out as pages of (font, x, y, text) lines, before anything is drawn."""
+    max_width = PAGE_WIDTH - 2 * MARGIN
+    pages = [[]]
+    y = TOP
+
+    def add(piece, font, leading=LEADING):
+        nonlocal y
+        if y < BOTTOM:
+            pages.append([])
+            y = TOP
+        pages[-1].append((font, MARGIN, y, piece))
+        y -= leading
+
+    for piece in wrap_line(_printable(title), max_width, *TITLE_FONT):
+        add(piece, TITLE_FONT, leading=22)
+    y -= 8
+
+    for line in _printable(text).splitlines():
+        # Light markdown: "#" headings in bold, "**" and bullet markers simplified
+        stripped = line.strip()
+        font = BODY_FONT
+        if stripped.startswith("#"):
+            font = HEADING_FONT
+            stripped = stripped.lstrip("#").strip()
+        elif stripped[:2] in ("- ", "* "):
+            stripped = "• " + stripped[2:]
+        stripped = stripped.replace("**", "")
+        for piece in wrap_line(stripped, max_width, *font):
+            add(piece, font)
+    return pages
+
+
+def render_pdf(title, text, footer=None):
+    """Render a title and body text to PDF bytes, entirely in memory.
+
+    Pages break when the body area is full, and every page gets a footer with the
+    generation time and "Page n of N".
+    """
+    with telemetry.span("render_pdf", chars=len(text)) as span:
+        pdf, pages = _render(title, text, footer)
+        span.set(pages=pages, bytes=len(pdf))
+    return pdf
+
+
+def _render(title, text, footer):
+    footer = footer or f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    pages = _layout(title, text)
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    for number, lines in enumerate(pages, start=1):
+        current_font = None
+        for font, x, y, piece in lines:
+            if font != current_font:
+                c.setFont(*font)
+                current_font = font
+            c.drawString(x, y, piece)
+        c.setFont(*FOOTER_FONT)
+        c.drawString(MARGIN, 30, footer)
+        c.drawRightString(PAGE_WIDTH - MARGIN, 30, f"Page {number} of {len(pages)}")
+        c.showPage()
     c.save()
-    c.setFont("Helvetica-Oblique", 9)
-    c.drawString(40, 30, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    return file_name
+    return buffer.getvalue(), len(pages)
 
 
+def generate_pdf(analysis_text, file_name="resume_analysis.pdf", *, title=REPORT_TITLE):
+    """Write the analysis report to file_name and return the path.
 
-def generate_text_pdf(title, content):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, txt=title, align="L")
-    pdf.ln(5)
-    pdf.set_font("Arial", size=11)
-    pdf.multi_cell(0, 10, txt=content, align="L")
-
-    pdf_bytes = pdf.output(dest='S').encode('latin1')
-    pdf_output = BytesIO(pdf_bytes)
-    return pdf_output
+    Use render_pdf() for the bytes without touching the disk, e.g. when several
+    sessions render reports at once.
+    """
+    with open(file_name, "wb") as f:
+        f.write(render_pdf(title, analysis_text))
+    return file_name
 
+
+def generate_text_pdf(title, content):
+    return BytesIO(render_pdf(title, content))